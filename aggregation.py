@@ -0,0 +1,47 @@
+import numpy as np
+
+
+def ks(x, rho=50.0):
+    """
+    Kreisselmeier–Steinhauser 聚合：KS(x) = max(x) + ln Σ exp(ρ·(x_i − max(x))) / ρ，
+    是 max(x) 的光滑上界，误差不超过 ln(n)/ρ
+
+    Args:
+        x: (n,) 数组
+        rho: 聚合参数，越大越接近 max(x)
+
+    Returns:
+        value: 聚合值
+        grad: (n,) 聚合值对 x 的导数
+
+    """
+    x = np.asarray(x, dtype=float)
+    m = x.max()
+    w = np.exp(rho * (x - m))
+    total = w.sum()
+
+    return m + np.log(total) / rho, w / total
+
+
+def p_norm(x, p=8.0):
+    """
+    p 范数聚合：(Σ x_i^p)^(1/p)，x 非负，p 越大越接近 max(x)
+
+    Args:
+        x: (n,) 非负数组
+        p: 范数阶数
+
+    Returns:
+        value: 聚合值
+        grad: (n,) 聚合值对 x 的导数
+
+    """
+    x = np.asarray(x, dtype=float)
+    m = x.max()
+    if m == 0:
+        return 0.0, np.zeros_like(x)
+
+    # 以最大值归一化，避免 x^p 上溢或下溢
+    value = m * np.sum((x / m) ** p) ** (1 / p)
+
+    return value, (x / value) ** (p - 1)
@@ -0,0 +1,99 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator
+
+
+def sparse_pattern(dof, n):
+    """
+    由单元自由度映射生成总体矩阵的 CSR 稀疏模式
+
+    Args:
+        dof: (n_elem, m) 单元自由度映射，值为 -1 的自由度（例如约束自由度）被忽略
+        n: 总体矩阵阶数
+
+    Returns:
+        indptr, indices: CSR 结构数组
+        pos: (n_elem, m, m) 单元矩阵各元素在 CSR data 中的位置，被忽略的元素为 -1
+
+    """
+    dof = np.asarray(dof, dtype=np.int64)
+    m = dof.shape[1]
+    rows = np.broadcast_to(dof[:, :, None], (len(dof), m, m))
+    cols = np.broadcast_to(dof[:, None, :], (len(dof), m, m))
+    keep = (rows >= 0) & (cols >= 0)
+
+    # 按行优先的线性键排序去重即为 CSR 顺序
+    keys = rows[keep] * n + cols[keep]
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+
+    indices = (unique_keys % n).astype(np.int32)
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(unique_keys // n, minlength=n), out=indptr[1:])
+
+    pos = np.full(rows.shape, -1, dtype=np.int64)
+    pos[keep] = inverse.ravel()
+
+    return indptr, indices, pos
+
+
+def affine_operator(pos, Ke, nnz):
+    """
+    生成把单元系数映射到总体矩阵 CSR data 的稀疏算子 P，使 data = P @ x 等价于组装 Σ x_e·Ke
+
+    Args:
+        pos: sparse_pattern 返回的位置数组
+        Ke: (n_elem, m, m) 单位系数对应的单元矩阵堆叠
+        nnz: CSR 非零元个数
+
+    Returns:
+        nnz × n_elem 的 CSR 稀疏矩阵
+
+    """
+    n_elem = len(pos)
+    element = np.broadcast_to(np.arange(n_elem)[:, None, None], pos.shape)
+    keep = pos >= 0
+
+    return csr_matrix((Ke[keep], (pos[keep], element[keep])), shape=(nnz, n_elem))
+
+
+class ElementOperator(LinearOperator):
+    def __init__(self, dof, Ke, n):
+        """
+        逐单元的无矩阵线性算子，K @ u 按"收集单元自由度 → 批量乘单元矩阵 → 散射累加"计算，
+        不形成总体矩阵，内存只与单元数成正比，可直接用于共轭梯度法或幂迭代
+
+        Args:
+            dof: (n_elem, m) 单元自由度映射，值为 -1 的自由度（例如约束自由度）被忽略
+            Ke: (n_elem, m, m) 单元矩阵堆叠
+            n: 算子阶数
+
+        """
+        super().__init__(dtype=float, shape=(n, n))
+        # 被忽略的自由度指向末尾补充的一个零分量，收集与散射时无需掩码
+        self.dof = np.where(np.asarray(dof) >= 0, dof, n)
+        self.Ke = Ke
+
+    def _matvec(self, x):
+        n = self.shape[0]
+        u = np.append(np.ravel(x), 0.0)[self.dof]
+        f = np.einsum('eij,ej->ei', self.Ke, u)
+        return np.bincount(self.dof.ravel(), weights=f.ravel(), minlength=n + 1)[:n]
+
+    def _matmat(self, X):
+        return np.column_stack([self._matvec(x) for x in np.asarray(X).T])
+
+    def _adjoint(self):
+        # 单元矩阵对称，算子自伴
+        return self
+
+    def diagonal(self):
+        """
+        算子的对角元，用于 Jacobi 预条件
+
+        Returns:
+            (n,) 数组
+
+        """
+        n = self.shape[0]
+        d = np.diagonal(self.Ke, axis1=1, axis2=2)
+        return np.bincount(self.dof.ravel(), weights=d.ravel(), minlength=n + 1)[:n]
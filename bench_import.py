@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+# 分析进程（例如进程池中的 worker）导入 Frame2D 的时间预算（秒）与不应被加载的模块
+BUDGET = 0.6
+REPEAT = 5
+MODULES = ('systems', 'parallel')
+FORBIDDEN = ('matplotlib',)
+
+CODE = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = [name for name in {forbidden!r} if name in sys.modules]
+print(elapsed, ','.join(loaded))
+'''
+
+
+def measure(module):
+    """
+    在新的解释器中导入 module，返回导入耗时的中位数（秒）和被加载的禁用模块
+    """
+    times, loaded = [], set()
+    for _ in range(REPEAT):
+        out = subprocess.run([sys.executable, '-c', CODE.format(module=module, forbidden=FORBIDDEN)],
+                             capture_output=True, text=True, check=True).stdout.split()
+        times.append(float(out[0]))
+        if len(out) > 1:
+            loaded.update(out[1].split(','))
+    return sorted(times)[len(times) // 2], sorted(loaded)
+
+
+if __name__ == '__main__':
+    ok = True
+    for module in MODULES:
+        elapsed, loaded = measure(module)
+        passed = elapsed <= BUDGET and not loaded
+        ok &= passed
+        print(f"{module:10s} {elapsed * 1000:8.1f} ms  budget {BUDGET * 1000:.0f} ms  "
+              f"{'loaded ' + ', '.join(loaded) if loaded else ''}  {'OK' if passed else 'FAIL'}")
+    sys.exit(0 if ok else 1)
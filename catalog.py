@@ -0,0 +1,133 @@
+import numpy as np
+from shape import Generalized
+
+
+class SectionCatalog:
+    def __init__(self, names, A, I, y_max, mass=None):
+        """
+        离散截面库（标准型材表），每个条目为 Generalized 形式的 A、I、y_max 及单位长度质量
+
+        条目按质量从小到大排序；另外按抗弯截面模量 W = I/y_max 建立容量索引，
+        "满足需求的最轻截面"查找对任意多个需求一次向量化完成。
+
+        Args:
+            names: 型材名称列表
+            A: 截面积数组
+            I: 惯性矩数组
+            y_max: y 方向上的最大距离数组
+            mass: 单位长度质量数组，为 None 时以截面积代替（同一材料时二者成正比）
+
+        """
+        A, I, y_max = (np.asarray(v, dtype=float) for v in (A, I, y_max))
+        mass = A.copy() if mass is None else np.asarray(mass, dtype=float)
+
+        order = np.argsort(mass, kind='stable')
+        self.names = [names[i] for i in order]
+        self.A, self.I, self.y_max, self.mass = A[order], I[order], y_max[order], mass[order]
+        self.W = self.I / self.y_max  # 抗弯截面模量
+
+        # 容量索引：按 W 升序排列，lightest_above[k] 为 W 不小于第 k 个 W 的条目中最轻者
+        self.W_order = np.argsort(self.W, kind='stable')
+        self.W_sorted = self.W[self.W_order]
+        # 条目按质量排序，序号越小越轻，因此后缀最小序号即最轻者
+        self.lightest_above = np.minimum.accumulate(self.W_order[::-1])[::-1]
+
+    def __len__(self):
+        return len(self.names)
+
+    def shape(self, index: int):
+        """
+        返回第 index 个条目对应的截面形状
+
+        Args:
+            index: 条目序号（按质量排序后）
+
+        Returns:
+            Generalized 对象
+
+        """
+        return Generalized(self.A[index], self.I[index], self.y_max[index])
+
+    def lightest(self, W_req):
+        """
+        满足抗弯截面模量需求的最轻条目（利用容量索引二分查找）
+
+        Args:
+            W_req: 需求的抗弯截面模量，标量或数组
+
+        Returns:
+            条目序号数组，没有满足需求的条目时为 -1
+
+        """
+        k = np.searchsorted(self.W_sorted, W_req, side='left')
+        found = k < len(self)
+        return np.where(found, self.lightest_above[np.minimum(k, len(self) - 1)], -1)
+
+    def lightest_for_stress(self, N, M, stress_limit):
+        """
+        满足应力条件 |N|/A + |M|/W ≤ stress_limit 的最轻条目，对所有需求一次向量化判断
+
+        Args:
+            N: (...,) 轴力
+            M: (..., m) 弯矩，最后一维为同一构件需同时满足的多个截面（例如单元两端）
+            stress_limit: 许用应力
+
+        Returns:
+            (...,) 条目序号数组，没有满足需求的条目时为 -1
+
+        """
+        N = np.abs(np.asarray(N, dtype=float))[..., None, None]
+        M = np.abs(np.asarray(M, dtype=float))[..., None]
+        feasible = np.all(N / self.A + M / self.W <= stress_limit, axis=-2)  # (..., n_section)
+
+        # 条目按质量排序，第一个可行条目即最轻
+        index = np.argmax(feasible, axis=-1)
+        return np.where(feasible.any(axis=-1), index, -1)
+
+
+def discrete_sizing(frame, catalog: SectionCatalog, stress_limit, elements=None, max_iter=20):
+    """
+    离散截面选型（满应力迭代）：每次迭代只做一次结构分析，用所有单元的内力一次性为每个单元选出满足应力条件的最轻截面，
+    直到选型不再变化
+
+    被选型的单元必须使用 Generalized 截面（形状参数为 A、I、y_max）。
+
+    Args:
+        frame: Frame2D 对象
+        catalog: 截面库
+        stress_limit: 许用应力
+        elements: 参与选型的单元序号数组（从 0 开始），为 None 时表示全部单元
+        max_iter: 最大迭代次数
+
+    Returns:
+        字典，包含
+            index: (n_member,) 各单元最终选用的条目序号
+            names: 各单元最终选用的型材名称
+            converged: 选型是否收敛
+            iterations: 迭代次数
+
+    """
+    members = frame.param_elements('I') if elements is None else np.atleast_1d(np.asarray(elements, dtype=int))
+    if not np.isin(members, frame.param_elements('I')).all():
+        raise ValueError("Discrete sizing requires Generalized sections (parameters A, I, y_max)")
+
+    index = np.full(len(members), -2)
+    converged = False
+    for iteration in range(1, max_iter + 1):
+        # 一次分析得到所有单元的内力
+        f = frame.cal_element_nodal_force()[members]
+        new_index = catalog.lightest_for_stress(f[:, 0], f[:, [2, 5]], stress_limit)
+        if (new_index < 0).any():
+            missing = members[new_index < 0] + 1
+            raise ValueError(f"No catalog section satisfies the stress limit for element(s) {missing.tolist()}")
+
+        if np.array_equal(new_index, index):
+            converged = True
+            break
+        index = new_index
+        frame.set_shape_params(members, A=catalog.A[index], I=catalog.I[index], y_max=catalog.y_max[index])
+
+    return {'index': index,
+            'names': [catalog.names[i] for i in index],
+            'converged': converged,
+            'iterations': iteration}
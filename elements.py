@@ -40,6 +40,14 @@ class Beam:
         self.K_global = None
         self.M_e = None
 
+        # 最近一次 update 时的截面形状参数和截面性质（多个单元共用同一截面对象时各自保留）
+        self.shape_params = {}
+        self.A = None
+        self.I = None
+        self.y_max = None
+
+        self.system = None  # 单元所属的结构系统，截面改变时通知其清除缓存
+
         self.update()
 
     def update(self):
@@ -47,10 +55,21 @@ class Beam:
         rho = self.section.material.rho
         A = self.section.shape.A
         I = self.section.shape.I
+        T = transfer_matrix(self.Phi)
         self.K_local = K_beam_local(E, A, I, self.L)
-        self.K_global = transfer_matrix(self.Phi).T @ self.K_local @ transfer_matrix(self.Phi)
+        self.K_global = T.T @ self.K_local @ T
         self.M_e = M_beam(rho, A, self.L)
+        self.shape_params = dict(self.section.shape.parameters)
+        self.A, self.I, self.y_max = A, I, self.section.shape.y_max
+
+        if self.system is not None:
+            self.system.on_element_update(self)
 
     def update_shape_params(self, **kwargs):
         self.section.update_shape_params(**kwargs)
-        self.update()
+
+        # 参数与本单元当前参数相同则无需重新计算单元矩阵；属于结构系统时以系统的截面性质存储为准，
+        # 因为 set_shape_params 只写存储，不更新本单元的快照
+        current = self.system.element_shape_params(self) if self.system is not None else self.shape_params
+        if any(current.get(key) != value for key, value in kwargs.items()):
+            self.update()
@@ -33,25 +33,20 @@ s.add_fixed_sup(1, 2, 3)
 s.add_single_force(5, Fx=200000, Fy=-50000)
 s.add_single_moment(5, M=5000)
 
+# 所有单元共用同一个半径：一个设计变量，经连接矩阵写入各单元
+s.add_design_group('R', 1, 2, 3, 4)
+
 
 # -----------------------------------------------
 
 # --------------------优化函数--------------------
-def structure_weight(R: float):
-    G = 0
-    for e in s.elements:
-        e.update_shape_params(R=R)
-        rho = e.section.material.rho
-        A = e.section.shape.A
-        L = e.L
-        G += rho * A * L
-
-    return G
+def structure_weight(x: np.ndarray):
+    s.set_design(x)
+    return s.get_weight()
 
 
-def F(R: float):
-    for e in s.elements:
-        e.update_shape_params(R=R)
+def F(x: np.ndarray):
+    s.set_design(x)
     max_stress = s.get_max_stress()
     return max_stress
 
@@ -59,23 +54,34 @@ def F(R: float):
 tol = 100e6
 
 
-def func(r): return structure_weight(r[0])
+def func(r): return structure_weight(r)
+
+
+def constraint(r): return tol - F(r)
+
+
+# 对各单元参数的导数经连接矩阵链式转换为对设计变量的导数
+def func_jac(r):
+    structure_weight(r)
+    return s.design_gradient(s.weight_gradient)
 
 
-def constraint(r): return tol - F(r[0])
+def constraint_jac(r):
+    F(r)
+    return -s.design_gradient(s.stress_gradient)
 
 
-cons = ({'type': 'ineq', 'fun': lambda r: constraint(r)})
+cons = ({'type': 'ineq', 'fun': lambda r: constraint(r), 'jac': constraint_jac})
 
 r0 = np.array([0.05])
 
 # 定义截面半径的边界
 bounds = [(0.01, 0.1)]
 
-res = minimize(func, r0, method='SLSQP', constraints=cons, bounds=bounds)
+res = minimize(func, r0, jac=func_jac, method='SLSQP', constraints=cons, bounds=bounds)
 print("最小值:", res.fun)
 print("最优解:", res.x)
 print("迭代终止是否成功", res.success)
 print("迭代终止原因", res.message)
 
-print(F(res.x[0]))
+print(F(res.x))
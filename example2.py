@@ -36,32 +36,49 @@ s.add_single_moment(5, M=5000)
 # -----------------------------------------------
 
 # --------------------优化函数--------------------
+# 各单元的半径整体写入 s 的截面性质存储，单元之间互不影响
 def structure_weight(R: np.ndarray):
-    G = 0
-    for i, e in enumerate(s.elements):
-        e.update_shape_params(R=R[i])
-        rho = e.section.material.rho
-        A = e.section.shape.A
-        L = e.L
-        G += rho * A * L
-
-    return G
+    s.set_shape_params(R=R)
+    return s.get_weight()
 
 
 def F(R: np.ndarray):
-    for i, e in enumerate(s.elements):
-        e.update_shape_params(R=R[i])
+    s.set_shape_params(R=R)
     max_stress = s.get_max_stress()
     return max_stress
 
 
+# 每个单元一个应力约束（向量形式），避免 max 带来的不光滑
+def element_stress(R: np.ndarray):
+    s.set_shape_params(R=R)
+    return s.get_element_stress()
+
+
 tol = 100e6
 
+# 目标与约束都归一化到 1 的量级，SLSQP 的收敛判据与线搜索对量级敏感
+w_ref = 100.0
+
+
+def func(r): return structure_weight(r) / w_ref
+
+
+# 伴随法解析导数，避免 SLSQP 对每个设计变量做有限差分
+def func_jac(r):
+    structure_weight(r)
+    return s.weight_gradient('R') / w_ref
+
+
+def constraint(r): return 1 - element_stress(r) / tol
+
 
-def func(r): return structure_weight(r)
+# 所有单元应力的雅可比矩阵只需一次多右端项伴随求解
+def constraint_jac(r):
+    element_stress(r)
+    return -s.stress_jacobian('R') / tol
 
 
-cons = ({'type': 'ineq', 'fun': lambda r: tol - F(r)})
+cons = ({'type': 'ineq', 'fun': constraint, 'jac': constraint_jac})
 
 r0 = np.array([0.01,
                0.01,
@@ -74,8 +91,8 @@ bounds = [(0.001, 0.05),
           (0.001, 0.05),
           (0.001, 0.05)]
 
-res = minimize(func, r0, method='SLSQP', constraints=cons, bounds=bounds)
-print("最小值:", res.fun)
+res = minimize(func, r0, jac=func_jac, method='SLSQP', constraints=cons, bounds=bounds)
+print("最小值:", res.fun * w_ref)
 print("最优解:", res.x)
 print("迭代终止是否成功", res.success)
 print("迭代终止原因", res.message)
@@ -66,3 +66,125 @@ def transfer_matrix(phi):
                      [0, 0, 0, cos(phi), sin(phi), 0],
                      [0, 0, 0, -sin(phi), cos(phi), 0],
                      [0, 0, 0, 0, 0, 1]])
+
+
+# 局部单刚中各刚度系数对应的位置模式
+_K_AXIAL = np.zeros((6, 6))
+_K_AXIAL[np.ix_([0, 3], [0, 3])] = [[1, -1], [-1, 1]]
+
+_K_BEND_12 = np.zeros((6, 6))  # 12EI/L³
+_K_BEND_12[np.ix_([1, 4], [1, 4])] = [[1, -1], [-1, 1]]
+
+_K_BEND_6 = np.zeros((6, 6))  # 6EI/L²
+_K_BEND_6[np.ix_([1, 4], [2, 5])] = [[1, 1], [-1, -1]]
+_K_BEND_6 += _K_BEND_6.T
+
+_K_BEND_4 = np.zeros((6, 6))  # 4EI/L
+_K_BEND_4[[2, 5], [2, 5]] = 1
+
+_K_BEND_2 = np.zeros((6, 6))  # 2EI/L
+_K_BEND_2[[2, 5], [5, 2]] = 1
+
+# 一致质量矩阵按 L 的幂次拆分
+_M_0 = np.array([[1 / 3, 0, 0, 1 / 6, 0, 0],
+                 [0, 13 / 35, 0, 0, 9 / 70, 0],
+                 [0, 0, 0, 0, 0, 0],
+                 [1 / 6, 0, 0, 1 / 3, 0, 0],
+                 [0, 9 / 70, 0, 0, 13 / 35, 0],
+                 [0, 0, 0, 0, 0, 0]])
+_M_1 = np.zeros((6, 6))
+_M_1[np.ix_([1, 4], [2, 5])] = [[11 / 210, -13 / 420],
+                                [13 / 420, -11 / 210]]
+_M_1 += _M_1.T
+_M_2 = np.zeros((6, 6))
+_M_2[np.ix_([2, 5], [2, 5])] = [[1 / 105, -1 / 140],
+                                [-1 / 140, 1 / 105]]
+
+
+def K_beam_local_batch(E, A, I, L):
+    """
+    批量计算二维钢架单元的局部单元刚度矩阵
+
+    Args:
+        E: 杨氏模量数组
+        A: 截面积数组
+        I: 惯性矩数组
+        L: 单元长度数组
+
+    Returns:
+        (..., 6, 6) 单元刚度矩阵堆叠，前导维度为各参数广播后的形状
+
+    """
+    E, A, I, L = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (E, A, I, L)))
+    EA_L = (E * A / L)[..., None, None]
+    EI = (E * I)[..., None, None]
+    L = L[..., None, None]
+
+    return (EA_L * _K_AXIAL +
+            EI / L ** 3 * 12 * _K_BEND_12 +
+            EI / L ** 2 * 6 * _K_BEND_6 +
+            EI / L * 4 * _K_BEND_4 +
+            EI / L * 2 * _K_BEND_2)
+
+
+def M_beam_batch(rho, A, L):
+    """
+    批量计算二维钢架单元质量矩阵（局部坐标系）
+
+    Args:
+        rho: 质量密度数组
+        A: 截面积数组
+        L: 单元长度数组
+
+    Returns:
+        (..., 6, 6) 单元质量矩阵堆叠
+
+    """
+    rho, A, L = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (rho, A, L)))
+    L = L[..., None, None]
+
+    return (rho * A)[..., None, None] * L * (_M_0 + L * _M_1 + L ** 2 * _M_2)
+
+
+def transfer_matrix_batch(phi):
+    """
+    批量计算二维钢架单元坐标转换矩阵
+
+    Args:
+        phi: 单元偏转角数组（单位为弧度）
+
+    Returns:
+        (..., 6, 6) 坐标转换矩阵堆叠
+
+    """
+    phi = np.asarray(phi, dtype=float)
+    c, s = cos(phi), sin(phi)
+
+    T = np.zeros(phi.shape + (6, 6))
+    for k in (0, 3):
+        T[..., k, k] = c
+        T[..., k, k + 1] = s
+        T[..., k + 1, k] = -s
+        T[..., k + 1, k + 1] = c
+        T[..., k + 2, k + 2] = 1
+
+    return T
+
+
+def K_beam_global_batch(E, A, I, L, phi):
+    """
+    批量计算二维钢架单元的整体坐标系单元刚度矩阵 Tᵀ·K·T
+
+    Args:
+        E: 杨氏模量数组
+        A: 截面积数组
+        I: 惯性矩数组
+        L: 单元长度数组
+        phi: 单元偏转角数组
+
+    Returns:
+        (..., 6, 6) 单元刚度矩阵堆叠
+
+    """
+    T = transfer_matrix_batch(phi)
+    return np.swapaxes(T, -1, -2) @ K_beam_local_batch(E, A, I, L) @ T
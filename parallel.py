@@ -0,0 +1,186 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from systems import Frame2D
+
+# 工作进程中模型的原始状态，由进程初始化函数设置；每个任务开始前由它重建一个模型，
+# 任务对设计、荷载或求解设置的修改不会带到同一进程的下一个任务
+_pristine = None
+_shared_memory = None
+
+# 工作进程会修改的设计状态数组，附加时复制一份，其余数组只读共享
+_PRIVATE_ARRAYS = ('A', 'I', 'y_max', 'F', 'F_cases')
+
+
+class SharedModel:
+    def __init__(self, model: Frame2D):
+        """
+        把编译后的模型数组放入一块共享内存，工作进程通过 handle 零拷贝地附加
+
+        Args:
+            model: Frame2D 模型
+
+        """
+        arrays, meta = model.export_arrays()
+
+        # 每个数组按 64 字节对齐排布
+        manifest, offset = {}, 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            manifest[name] = (offset, array.shape, array.dtype.str)
+            offset += -(-array.nbytes // 64) * 64
+
+        self.shm = SharedMemory(create=True, size=max(offset, 1))
+        for name, array in arrays.items():
+            start, shape, dtype = manifest[name]
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=start)[...] = array
+
+        self.handle = (self.shm.name, manifest, meta)
+
+    def close(self):
+        """释放共享内存"""
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(handle):
+    """
+    在工作进程中附加共享内存并重建模型
+
+    Args:
+        handle: SharedModel.handle
+
+    Returns:
+        (model, shm)，使用模型期间需要保持 shm 的引用
+
+    """
+    arrays, meta, shm = _map_shared(handle)
+    return _rebuild(arrays, meta), shm
+
+
+def _map_shared(handle):
+    """附加共享内存，返回其中数组的只读视图"""
+    name, manifest, meta = handle
+    shm = SharedMemory(name=name)
+
+    arrays = {}
+    for key, (offset, shape, dtype) in manifest.items():
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[key] = array
+
+    return arrays, meta, shm
+
+
+def _rebuild(arrays, meta):
+    """由共享数组重建模型，设计状态数组复制一份，其余数组零拷贝"""
+    arrays = {key: array.copy() if key in _PRIVATE_ARRAYS or key.startswith('shape_params_') else array
+              for key, array in arrays.items()}
+    return Frame2D.from_arrays(arrays, meta)
+
+
+def _init_worker(model):
+    global _pristine
+    _pristine = pickle.dumps(model)
+
+
+def _init_worker_shared(handle):
+    global _pristine, _shared_memory
+    arrays, meta, _shared_memory = _map_shared(handle)
+    _pristine = (arrays, meta)
+
+
+def _fresh_model():
+    """按工作进程中保存的原始状态重建一个模型：共享内存模式只复制设计状态数组，否则反序列化整个模型"""
+    if isinstance(_pristine, bytes):
+        return pickle.loads(_pristine)
+    return _rebuild(*_pristine)
+
+
+def _run_chunk(func, chunk):
+    return [(i, func(_fresh_model(), item)) for i, item in chunk]
+
+
+class ParallelRunner:
+    def __init__(self, builder, max_workers: int = None, chunk_size: int = 1, shared_memory: bool = True):
+        """
+        多进程并行执行器，用于参数扫描和多初始点优化
+
+        模型在主进程中创建并编译一次。默认把编译后的数组放入共享内存，工作进程零拷贝地附加，
+        只复制少量设计状态数组；之后的任务只传递任务参数和结果。
+
+        Args:
+            builder: 可 pickle 的无参函数，返回 Frame2D 模型
+            max_workers: 工作进程数，默认为 CPU 核数
+            chunk_size: 每个任务包含的参数个数，任务很小时增大该值可以减少进程间通信开销
+            shared_memory: 为 False 时改为在每个工作进程启动时 pickle 整个模型（任务需要 Node/Beam 对象时使用）
+
+        """
+        self.model = builder()
+        self.model.compile()
+        self.max_workers = max_workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.shared_memory = shared_memory
+        self._shared = None
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def start(self):
+        """启动进程池，模型在每个工作进程启动时传递一次"""
+        if self._executor is not None:
+            return
+        if self.shared_memory:
+            self._shared = SharedModel(self.model)
+            initializer, initargs = _init_worker_shared, (self._shared.handle,)
+        else:
+            initializer, initargs = _init_worker, (self.model,)
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             initializer=initializer,
+                                             initargs=initargs)
+
+    def shutdown(self):
+        """关闭进程池并释放共享内存"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def imap(self, func, items):
+        """
+        并行地对每个参数调用 func(model, item)，结果按完成顺序逐个返回
+
+        func 必须是可 pickle 的模块级函数。多初始点优化时 item 为初始点，func 中调用 scipy.optimize.minimize；
+        参数扫描时 item 为扫描值。每个任务拿到的都是处于原始状态的模型，任务中对截面、荷载或求解设置的修改
+        不会影响其他任务，结果与任务的调度顺序无关。
+
+        Args:
+            func: 任务函数 func(model, item)
+            items: 任务参数序列
+
+        Yields:
+            (i, result)，i 为参数在 items 中的序号
+
+        """
+        self.start()
+        indexed = list(enumerate(items))
+        futures = [self._executor.submit(_run_chunk, func, indexed[k:k + self.chunk_size])
+                   for k in range(0, len(indexed), self.chunk_size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+    def map(self, func, items):
+        """
+        并行地对每个参数调用 func(model, item)，等待全部完成后按 items 的顺序返回结果列表
+        """
+        results = dict(self.imap(func, items))
+        return [results[i] for i in range(len(results))]
@@ -0,0 +1,125 @@
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+
+def draw_frame(frame, ax, labels=True):
+    """
+    绘制原始结构（单元用一个 LineCollection）和节点，并设置坐标范围
+
+    Args:
+        frame: Frame2D 对象
+        ax: matplotlib 坐标轴
+        labels: 是否标注节点和单元编号
+
+    """
+    frame._check_compiled()
+    segments = frame.coords[frame.connectivity]
+    ax.add_collection(LineCollection(segments, colors='b', linewidths=3, alpha=0.6, label="Original"))
+    ax.plot(frame.coords[:, 0], frame.coords[:, 1], 'ro', linestyle='none')
+
+    if labels:
+        for i, (x, y) in enumerate(segments.mean(axis=1)):
+            ax.text(x, y, f'({i + 1})', fontsize=10)
+        for i, (x, y) in enumerate(frame.coords):
+            ax.text(x, y, f'{i + 1}', fontsize=12)
+
+    # 设置坐标范围，并添加20%边距
+    (x_min, y_min), (x_max, y_max) = frame.coords.min(axis=0), frame.coords.max(axis=0)
+    x_margin = (x_max - x_min) * 0.2 if x_max != x_min else 0.2
+    y_margin = (y_max - y_min) * 0.2 if y_max != y_min else 0.2
+    ax.set_xlim(x_min - x_margin, x_max + x_margin)
+    ax.set_ylim(y_min - y_margin, y_max + y_margin)
+
+    # 设置网格、比例和坐标轴
+    ax.grid(True)
+    ax.set_aspect('equal')
+    ax.set_xlabel("X")
+    ax.set_ylabel("Y")
+
+
+def plot_system(frame, initial_scale=1.0, scale_max=1000.0, n_points=20):
+    """
+    交互式绘制结构及其变形，拖动滑动条调整变形放大系数
+
+    Args:
+        frame: Frame2D 对象
+        initial_scale: 初始放大系数
+        scale_max: 放大系数上限
+        n_points: 每个单元变形曲线的采样点数
+
+    """
+    # pyplot 会选择并加载图形界面后端，只在交互绘图时导入
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import Slider
+
+    base, disp = frame.deformed_shape(n_points=n_points)
+
+    fig, ax = plt.subplots(figsize=(8, 8))
+    plt.subplots_adjust(left=0.1, bottom=0.3)  # 为滑动条留出空间
+    draw_frame(frame, ax)
+    ax.set_title("Frame System Deformation Visualization")
+
+    # 创建滑动条，使用 scale_max 设置最大值
+    ax_scale = plt.axes((0.1, 0.1, 0.8, 0.03), facecolor='lightgoldenrodyellow')
+    scale_slider = Slider(ax_scale, 'Scale', 0.1, scale_max, valinit=initial_scale, valstep=0.1)
+
+    # 所有单元的变形曲线放在一个 LineCollection 中，更新时只需一次数组运算
+    deformed = LineCollection(base + initial_scale * disp, colors='r', linestyles='--', linewidths=2,
+                              label="Deformed")
+    ax.add_collection(deformed)
+    ax.legend(loc='best')
+
+    def update(val):
+        deformed.set_segments(base + scale_slider.val * disp)
+        fig.canvas.draw_idle()
+
+    # 绑定滑动条到更新函数
+    scale_slider.on_changed(update)
+
+    plt.show()
+
+
+def save_deformed(frame, filename, U=None, scale=1.0, titles=None, n_points=20, labels=False, dpi=100):
+    """
+    不弹出窗口，把一个或多个变形图直接保存为图片（例如多个设计或多个荷载工况），用于批量生成报告
+
+    只使用 matplotlib 的 Figure 与 Agg 画布，不依赖图形界面；所有图片共用同一个画布，只更新变形曲线。
+
+    Args:
+        frame: Frame2D 对象
+        filename: 文件名，保存多张图时为含 {} 的格式字符串，例如 'deformed_{}.png'
+        U: (n_dof,) 或 (n_figure, n_dof) 节点位移，为 None 时为当前设计的位移；
+           多工况可传入 solve_load_cases()['U'].T
+        scale: 变形放大系数
+        titles: 各图标题，为 None 时使用序号
+        n_points: 每个单元变形曲线的采样点数
+        labels: 是否标注节点和单元编号
+        dpi: 图片分辨率
+
+    Returns:
+        保存的文件名列表
+
+    """
+    base, disp = frame.deformed_shape(U, n_points)
+    disp = disp.reshape((-1,) + base.shape)
+    if titles is None:
+        titles = [str(k) for k in range(len(disp))] if len(disp) > 1 else [""]
+
+    fig = Figure(figsize=(8, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    draw_frame(frame, ax, labels)
+    deformed = LineCollection(base, colors='r', linestyles='--', linewidths=2, label="Deformed")
+    ax.add_collection(deformed)
+    ax.legend(loc='best')
+
+    names = []
+    for k, d in enumerate(disp):
+        deformed.set_segments(base + scale * d)
+        ax.set_title(titles[k])
+        name = filename.format(titles[k] or k) if len(disp) > 1 else filename
+        fig.savefig(name, dpi=dpi)
+        names.append(name)
+
+    return names
@@ -72,11 +72,11 @@ class Beam:
                                              [-12, -6 * L, 12, -6 * L],
                                              [6 * L, 2 * L ** 2, -6 * L, 4 * L ** 2]])
 
-        # n2 方向的弯曲
-        K_B2 = (E * I2 / L ** 3) * np.array([[12, 6 * L, -12, 6 * L],
-                                             [6 * L, 4 * L ** 2, -6 * L, 2 * L ** 2],
-                                             [-12, -6 * L, 12, -6 * L],
-                                             [6 * L, 2 * L ** 2, -6 * L, 4 * L ** 2]])
+        # n2 方向的弯曲（右手系下绕 n1 的转角与 n2 方向位移的耦合项符号相反）
+        K_B2 = (E * I2 / L ** 3) * np.array([[12, -6 * L, -12, -6 * L],
+                                             [-6 * L, 4 * L ** 2, 6 * L, 2 * L ** 2],
+                                             [-12, 6 * L, 12, 6 * L],
+                                             [-6 * L, 2 * L ** 2, 6 * L, 4 * L ** 2]])
 
         K_local = np.zeros((12, 12))
 
@@ -98,7 +98,8 @@ class Beam:
         t = self.t
         t /= np.linalg.norm(t)
 
-        n1 = self.n1
+        # n1 不一定与轴线垂直，取其在垂直于轴线平面上的投影
+        n1 = self.n1 - np.dot(self.n1, t) * t
         n1 /= np.linalg.norm(n1)
 
         n2 = np.cross(t, n1)
@@ -0,0 +1,91 @@
+import numpy as np
+
+# 局部单刚中杆、扭转和两个方向弯曲对应的自由度
+_AXIAL_DOF = np.array([0, 6])
+_TORSION_DOF = np.array([3, 9])
+_BEND1_DOF = np.array([1, 5, 7, 11])  # n1 方向位移与绕 n2 的转角
+_BEND2_DOF = np.array([2, 4, 8, 10])  # n2 方向位移与绕 n1 的转角
+
+
+def _bending_block(EI, L, sign):
+    """
+    (..., 4, 4) 弯曲刚度块，sign 为位移与转角耦合项的符号（右手系下 n1 方向为 +1，n2 方向为 -1）
+    """
+    c = EI / L ** 3
+    s = sign * 6 * L
+    B = np.stack([np.stack([12 * np.ones_like(L), s, -12 * np.ones_like(L), s], axis=-1),
+                  np.stack([s, 4 * L ** 2, -s, 2 * L ** 2], axis=-1),
+                  np.stack([-12 * np.ones_like(L), -s, 12 * np.ones_like(L), -s], axis=-1),
+                  np.stack([s, 2 * L ** 2, -s, 4 * L ** 2], axis=-1)], axis=-2)
+    return c[..., None, None] * B
+
+
+def K_beam_local_batch(E, G, A, I1, I2, J, L):
+    """
+    批量计算三维梁单元的局部单元刚度矩阵
+
+    Args:
+        E: 杨氏模量数组
+        G: 剪切模量数组
+        A: 截面积数组
+        I1: n1 方向弯曲的惯性矩数组
+        I2: n2 方向弯曲的惯性矩数组
+        J: 扭转惯性矩数组
+        L: 单元长度数组
+
+    Returns:
+        (..., 12, 12) 单元刚度矩阵堆叠
+
+    """
+    E, G, A, I1, I2, J, L = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (E, G, A, I1, I2, J, L)))
+    K = np.zeros(L.shape + (12, 12))
+
+    bar = np.array([[1, -1], [-1, 1]])
+    K[..., _AXIAL_DOF[:, None], _AXIAL_DOF] = (E * A / L)[..., None, None] * bar
+    K[..., _TORSION_DOF[:, None], _TORSION_DOF] = (G * J / L)[..., None, None] * bar
+    K[..., _BEND1_DOF[:, None], _BEND1_DOF] = _bending_block(E * I1, L, 1.0)
+    K[..., _BEND2_DOF[:, None], _BEND2_DOF] = _bending_block(E * I2, L, -1.0)
+
+    return K
+
+
+def transfer_matrix_batch(t, n1):
+    """
+    批量计算三维梁单元坐标转换矩阵
+
+    Args:
+        t: (..., 3) 单元轴线方向（节点 1 指向节点 2）
+        n1: (..., 3) 用于确定梁摆放姿态的方向
+
+    Returns:
+        (..., 12, 12) 坐标转换矩阵堆叠
+
+    """
+    t = np.asarray(t, dtype=float)
+    t = t / np.linalg.norm(t, axis=-1, keepdims=True)
+    n1 = np.asarray(n1, dtype=float)
+    # n1 不一定与轴线垂直，取其在垂直于轴线平面上的投影，保证 R 为正交矩阵
+    n1 = n1 - np.sum(n1 * t, axis=-1, keepdims=True) * t
+    n1 = n1 / np.linalg.norm(n1, axis=-1, keepdims=True)
+    n2 = np.cross(t, n1)
+    n2 = n2 / np.linalg.norm(n2, axis=-1, keepdims=True)
+
+    R = np.stack([t, n1, n2], axis=-2)
+
+    T = np.zeros(R.shape[:-2] + (12, 12))
+    for i in range(4):
+        T[..., i * 3:(i + 1) * 3, i * 3:(i + 1) * 3] = R
+
+    return T
+
+
+def K_beam_global_batch(E, G, A, I1, I2, J, L, t, n1):
+    """
+    批量计算三维梁单元的整体坐标系单元刚度矩阵 Tᵀ·K·T
+
+    Returns:
+        (..., 12, 12) 单元刚度矩阵堆叠
+
+    """
+    T = transfer_matrix_batch(t, n1)
+    return np.swapaxes(T, -1, -2) @ K_beam_local_batch(E, G, A, I1, I2, J, L) @ T
@@ -0,0 +1,325 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from sa3d.elements import Node, Beam
+from sa3d.section import Section
+from sa3d.matrices import K_beam_local_batch, transfer_matrix_batch
+from assembly import sparse_pattern, ElementOperator
+from solvers import DirectSolver
+
+
+class Frame3D:
+    def __init__(self):
+        self.nodes: list[Node] = []
+        self.elements: list[Beam] = []
+        self.FnM: list[float] = []
+        self.fixed_dof: list[int] = []
+        self.node_index: dict[Node, int] = {}  # 节点对象 -> 节点序号（从 0 开始）
+
+        # 由 compile() 生成的连续数组
+        self.compiled = False
+        self.coords = None  # (n_node, 3) 节点坐标
+        self.connectivity = None  # (n_elem, 2) 单元两端的节点序号
+        self.element_dof = None  # (n_elem, 12) 单元自由度映射
+        self.fixed_mask = None  # (n_dof,) 约束自由度掩码（已去重）
+        self.free_dof = None  # (n_free,) 自由自由度排列
+        self.free_index = None  # (n_dof,) 自由度 -> 在 free_dof 中的位置，约束自由度为 -1
+        self.F = None  # (n_dof,) 节点荷载向量
+        self.t = None  # (n_elem, 3) 单元轴线方向
+        self.n1 = None  # (n_elem, 3) 单元姿态方向
+        self.L = None  # (n_elem,) 单元长度
+        self.props = None  # (6, n_elem) E, G, A, I1, I2, J（长度见 L）
+
+        # 总刚、分解与位移缓存
+        self._cache = {}
+
+    def add_node(self,
+                 x: float,
+                 y: float,
+                 z: float):
+        """
+        添加节点
+
+        Args:
+            x: x 坐标
+            y: y 坐标
+            z: z 坐标
+
+        """
+        node = Node(x, y, z)
+        self.node_index[node] = len(self.nodes)
+        self.nodes.append(node)
+        self.FnM += [0.0] * 6  # 给节点力向量分配自由度
+        self.invalidate()
+
+    def add_element(self,
+                    node1_id: int,
+                    node2_id: int,
+                    n1,
+                    section: Section):
+        """
+        添加单元
+
+        Args:
+            node1_id: 节点 1 编号
+            node2_id: 节点 2 编号
+            n1: 用于确定梁的摆放姿态，不能与单元轴线平行；与轴线不垂直时取其垂直于轴线的分量
+            section: 单元截面
+
+        """
+
+        # 检查节点索引是否在范围内
+        if node1_id - 1 < 0 or node2_id - 1 < 0 or node1_id > len(self.nodes) or node2_id > len(self.nodes):
+            print(f"Error: One or both nodes for Beam({node1_id}, {node2_id}) do not exist.")
+            return
+
+        beam = Beam(self.nodes[node1_id - 1],
+                    self.nodes[node2_id - 1],
+                    np.array(n1, dtype=float),
+                    section)
+
+        self.elements.append(beam)
+        self.invalidate()
+
+    def add_single_force(self,
+                         node_id: int,
+                         Fx=0.0,
+                         Fy=0.0,
+                         Fz=0.0):
+        """
+        添加节点力
+
+        Args:
+            node_id: 节点编号
+            Fx: x 方向力
+            Fy: y 方向力
+            Fz: z 方向力
+
+        """
+        i = node_id - 1
+        self.FnM[6 * i:6 * i + 3] = [Fx, Fy, Fz]
+        self.invalidate()
+
+    def add_single_moment(self,
+                          node_id: int,
+                          Mx=0.0,
+                          My=0.0,
+                          Mz=0.0):
+        """
+        添加集中力矩
+
+        Args:
+            node_id: 节点编号
+            Mx: 绕 x 轴的力矩
+            My: 绕 y 轴的力矩
+            Mz: 绕 z 轴的力矩
+
+        """
+        i = node_id - 1
+        self.FnM[6 * i + 3:6 * i + 6] = [Mx, My, Mz]
+        self.invalidate()
+
+    def add_fixed_sup(self, *args):
+        """添加固定支座"""
+        for node_id in args:
+            i = node_id - 1
+            self.fixed_dof += list(range(6 * i, 6 * i + 6))
+        self.invalidate()
+
+    def add_simple_sup(self, *args):
+        """添加铰支座（约束三个平动自由度）"""
+        for node_id in args:
+            i = node_id - 1
+            self.fixed_dof += list(range(6 * i, 6 * i + 3))
+        self.invalidate()
+
+    def invalidate(self):
+        """标记模型已改变，清除编译结果和缓存"""
+        self.compiled = False
+        self._cache.clear()
+
+    def compile(self):
+        """
+        冻结模型，生成节点坐标、单元连接关系、自由度映射、约束掩码、荷载向量以及单元几何和截面性质数组
+
+        Returns:
+            self
+
+        """
+        n_dof = len(self.FnM)
+
+        self.coords = np.array([[node.x, node.y, node.z] for node in self.nodes], dtype=float).reshape(-1, 3)
+        self.connectivity = np.array([[self.node_index[element.node1], self.node_index[element.node2]]
+                                      for element in self.elements], dtype=int).reshape(-1, 2)
+        self.element_dof = (6 * self.connectivity[:, np.repeat([0, 1], 6)] +
+                            np.tile(np.arange(6), 2))
+
+        self.fixed_mask = np.zeros(n_dof, dtype=bool)
+        self.fixed_mask[np.array(self.fixed_dof, dtype=int)] = True
+        self.free_dof = np.flatnonzero(~self.fixed_mask)
+        self.free_index = np.full(n_dof, -1)
+        self.free_index[self.free_dof] = np.arange(len(self.free_dof))
+        self.F = np.array(self.FnM, dtype=float)
+
+        self.t = (self.coords[self.connectivity[:, 1]] - self.coords[self.connectivity[:, 0]]).reshape(-1, 3)
+        self.n1 = np.array([element.n1 for element in self.elements], dtype=float).reshape(-1, 3)
+        self.L = np.linalg.norm(self.t, axis=1)
+        self.props = np.array([[element.section.material.E,
+                                element.section.material.G,
+                                element.section.shape.A,
+                                *element.section.shape.I] for element in self.elements], dtype=float).reshape(-1, 6).T
+
+        self.compiled = True
+        return self
+
+    def _check_compiled(self):
+        if not self.compiled:
+            self.compile()
+
+    def _element_matrices(self):
+        """
+        批量计算单元矩阵
+
+        Returns:
+            K_local, T，均为 (n_elem, 12, 12) 数组
+
+        """
+        self._check_compiled()
+        if 'element' not in self._cache:
+            K_local = K_beam_local_batch(*self.props, self.L)
+            T = transfer_matrix_batch(self.t, self.n1)
+            self._cache['element'] = (K_local, T)
+        return self._cache['element']
+
+    def _assemble(self, dof, n):
+        """由 (n_elem, 12, 12) 单刚堆叠一次散射组装 CSR 矩阵，约束自由度（dof 为 -1）被忽略"""
+        K_local, T = self._element_matrices()
+        Ke = np.swapaxes(T, 1, 2) @ K_local @ T
+
+        indptr, indices, pos = sparse_pattern(dof, n)
+        keep = pos >= 0
+        data = np.bincount(pos[keep], weights=Ke[keep], minlength=len(indices))
+
+        return csr_matrix((data, indices, indptr), shape=(n, n))
+
+    def cal_K_total(self, sparse=True):
+        """
+        计算总体刚度矩阵
+
+        Args:
+            sparse: 为 True 时返回 CSR 稀疏矩阵，否则返回稠密矩阵
+
+        Returns:
+            n×n 总体刚度矩阵
+
+        """
+        self._check_compiled()
+        if 'K' not in self._cache:
+            self._cache['K'] = self._assemble(self.element_dof, len(self.F))
+        K = self._cache['K']
+
+        return K if sparse else K.toarray()
+
+    def element_operator(self, free=True):
+        """
+        不形成总刚的逐单元刚度算子，内存为 O(n_elem)
+
+        Args:
+            free: 为 True 时为 K_ff 的算子（自由度按 free_dof 编号），否则为总刚的算子
+
+        Returns:
+            ElementOperator 对象（scipy LinearOperator）
+
+        """
+        K_local, T = self._element_matrices()
+        Ke = np.swapaxes(T, 1, 2) @ K_local @ T
+
+        if not free:
+            return ElementOperator(self.element_dof, Ke, len(self.F))
+        return ElementOperator(self.free_index[self.element_dof], Ke, len(self.free_dof))
+
+    def cal_K_total_reference(self):
+        """
+        逐单元调用 Beam.cal_K_local/cal_K_global 并用 Python 循环组装的稠密总刚，仅作为参考实现用于校核
+        """
+        self._check_compiled()
+        n = len(self.F)
+        K = np.zeros((n, n))
+
+        for element, dof in zip(self.elements, self.element_dof):
+            element.cal_K_local()
+            element.cal_K_global()
+            for i in range(12):
+                for j in range(12):
+                    K[dof[i], dof[j]] += element.K_global[i, j]
+
+        return K
+
+    def get_solver(self, dense=False):
+        """
+        获取 K_ff 的分解（带缓存）
+
+        Args:
+            dense: 是否使用稠密分解
+
+        Returns:
+            DirectSolver 对象
+
+        """
+        self._check_compiled()
+        key = 'factor_dense' if dense else 'factor'
+        if key not in self._cache:
+            K_ff = self._assemble(self.free_index[self.element_dof], len(self.free_dof))
+            self._cache[key] = DirectSolver(K_ff.toarray() if dense else K_ff, dense=dense)
+        return self._cache[key]
+
+    def solve_disp(self, tolerance=1e-10, dense=False):
+        """
+        求解节点位移
+
+        Args:
+            tolerance: 小于该值的位移将会被认为是0
+            dense: 为 True 时使用稠密分解，否则使用稀疏直接求解器
+
+        Returns:
+            (n_dof,) 节点位移，每个节点依次为 u, v, w, θx, θy, θz
+
+        """
+        self._check_compiled()
+        if 'U' not in self._cache:
+            U = np.zeros(len(self.F))
+            U[self.free_dof] = self.get_solver(dense).solve(self.F[self.free_dof])
+            self._cache['U'] = U
+
+        U = self._cache['U'].copy()
+        U[np.abs(U) < tolerance] = 0
+
+        return U
+
+    def solve_reaction(self, tolerance=1e-10):
+        """
+        求解反力
+
+        Args:
+            tolerance: 小于该值的力将会被认为是0
+
+        Returns:
+            (n_dof,) 支座反力
+
+        """
+        R = self.cal_K_total() @ self.solve_disp() - self.F
+        R[np.abs(R) < tolerance] = 0
+
+        return R
+
+    def cal_element_nodal_force(self):
+        """
+        求解局部坐标系下的单元节点力
+
+        Returns:
+            (n_elem, 12) 单元节点力，每端依次为轴力、两个剪力、扭矩和两个弯矩
+
+        """
+        K_local, T = self._element_matrices()
+        u_local = np.einsum('eij,ej->ei', T, self.solve_disp()[self.element_dof])
+
+        return np.einsum('eij,ej->ei', K_local, u_local)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import numpy as np
 from numpy import pi
 
 
@@ -30,6 +31,54 @@ class Shape(ABC):
         """
         raise NotImplementedError("子类需要实现 get_parameters 方法")
 
+    @classmethod
+    def properties(cls, **params) -> tuple:
+        """
+        由形状参数计算面积、惯性矩和 y_max，参数可以是标量或数组（逐元素计算）。
+
+        Returns:
+            (A, I, y_max)
+        """
+        raise NotImplementedError("子类需要实现 properties 方法")
+
+    @classmethod
+    def derivatives(cls, **params) -> dict[str, tuple]:
+        """
+        返回面积、惯性矩和 y_max 对各形状参数的偏导数，用于灵敏度分析。
+
+        Returns:
+            {参数名: (dA, dI, dy_max)}
+        """
+        raise NotImplementedError("子类需要实现 derivatives 方法")
+
+    @classmethod
+    def kernel(cls, params, derivatives=False):
+        """
+        向量化的截面性质核：一次把任意形状的参数数组映射为 A、I、y_max 数组，可同时给出对各参数的偏导数，
+        供所有单元、所有候选设计的截面性质更新与灵敏度分析使用。
+
+        Args:
+            params: (..., n_param) 参数数组，最后一维的顺序同 get_parameters()
+            derivatives: 是否同时返回偏导数
+
+        Returns:
+            props: (..., 3) 数组，最后一维依次为 A, I, y_max
+            jac: (..., 3, n_param) 偏导数数组，jac[..., i, j] 为第 i 个性质对第 j 个参数的偏导数（derivatives 为 True 时）
+        """
+        params = np.asarray(params, dtype=float)
+        names = list(cls.get_parameters())
+        columns = dict(zip(names, np.moveaxis(params, -1, 0)))
+
+        # 常数项（例如 dy_max/dR = 1）广播到参数数组的形状
+        like = np.empty(params.shape[:-1])
+        props = np.stack(np.broadcast_arrays(*cls.properties(**columns), like)[:3], axis=-1)
+        if not derivatives:
+            return props
+
+        partials = cls.derivatives(**columns)
+        jac = np.stack([np.stack(np.broadcast_arrays(*partials[name], like)[:3], axis=-1) for name in names], axis=-1)
+        return props, jac
+
 
 class Circle(Shape):
     def __init__(self, R: float):
@@ -46,10 +95,11 @@ class Circle(Shape):
         self.recalculate()
 
     def recalculate(self):
-        R = self.parameters['R']
-        self.A = pi * R ** 2
-        self.I = pi * R ** 4 / 4
-        self.y_max = R
+        self.A, self.I, self.y_max = self.properties(**self.parameters)
+
+    @classmethod
+    def properties(cls, R) -> tuple:
+        return pi * R ** 2, pi * R ** 4 / 4, R
 
     @classmethod
     def get_parameters(cls) -> dict[str, str]:
@@ -57,6 +107,12 @@ class Circle(Shape):
             'R': '圆的半径'
         }
 
+    @classmethod
+    def derivatives(cls, R) -> dict[str, tuple]:
+        return {
+            'R': (2 * pi * R, pi * R ** 3, 1.0)
+        }
+
 
 class Rectangle(Shape):
     def __init__(self, b: float, h: float):
@@ -73,11 +129,11 @@ class Rectangle(Shape):
         self.recalculate()
 
     def recalculate(self):
-        b = self.parameters['b']
-        h = self.parameters['h']
-        self.A = b * h
-        self.I = b * h ** 3 / 12
-        self.y_max = h / 2
+        self.A, self.I, self.y_max = self.properties(**self.parameters)
+
+    @classmethod
+    def properties(cls, b, h) -> tuple:
+        return b * h, b * h ** 3 / 12, h / 2
 
     @classmethod
     def get_parameters(cls) -> dict[str, str]:
@@ -86,6 +142,13 @@ class Rectangle(Shape):
             'h': '矩形的高度'
         }
 
+    @classmethod
+    def derivatives(cls, b, h) -> dict[str, tuple]:
+        return {
+            'b': (h, h ** 3 / 12, 0.0),
+            'h': (b, b * h ** 2 / 4, 0.5)
+        }
+
 
 class Box(Shape):
     def __init__(self,
@@ -112,15 +175,13 @@ class Box(Shape):
         self.recalculate()
 
     def recalculate(self):
-        a = self.parameters['a']
-        b = self.parameters['b']
-        t1 = self.parameters['t1']
-        t2 = self.parameters['t2']
-        t3 = self.parameters['t3']
-        t4 = self.parameters['t4']
-        self.A = a * b - (a - t1 - t3) * (b - t2 - t4)
-        self.I = a * b ** 3 / 12 - (a - t1 - t3) * (b - t2 - t4) ** 3 / 12
-        self.y_max = b / 2
+        self.A, self.I, self.y_max = self.properties(**self.parameters)
+
+    @classmethod
+    def properties(cls, a, b, t1, t2, t3, t4) -> tuple:
+        A = a * b - (a - t1 - t3) * (b - t2 - t4)
+        I = a * b ** 3 / 12 - (a - t1 - t3) * (b - t2 - t4) ** 3 / 12
+        return A, I, b / 2
 
     @classmethod
     def get_parameters(cls) -> dict[str, str]:
@@ -133,6 +194,24 @@ class Box(Shape):
             't4': '下壁厚'
         }
 
+    @classmethod
+    def derivatives(cls, a, b, t1, t2, t3, t4) -> dict[str, tuple]:
+        # 内腔尺寸
+        a_in = a - t1 - t3
+        b_in = b - t2 - t4
+        dA_dt_side = b_in  # 左右壁厚
+        dA_dt_top = a_in  # 上下壁厚
+        dI_dt_side = b_in ** 3 / 12
+        dI_dt_top = a_in * b_in ** 2 / 4
+        return {
+            'a': (b - b_in, (b ** 3 - b_in ** 3) / 12, 0.0),
+            'b': (a - a_in, (a * b ** 2 - a_in * b_in ** 2) / 4, 0.5),
+            't1': (dA_dt_side, dI_dt_side, 0.0),
+            't2': (dA_dt_top, dI_dt_top, 0.0),
+            't3': (dA_dt_side, dI_dt_side, 0.0),
+            't4': (dA_dt_top, dI_dt_top, 0.0)
+        }
+
 
 class Generalized(Shape):
     def __init__(self,
@@ -154,9 +233,24 @@ class Generalized(Shape):
         self.recalculate()
 
     def recalculate(self):
-        A = self.parameters['A']
-        I = self.parameters['I']
-        y_max = self.parameters['y_max']
-        self.A = A
-        self.I = I
-        self.y_max = y_max
+        self.A, self.I, self.y_max = self.properties(**self.parameters)
+
+    @classmethod
+    def properties(cls, A, I, y_max) -> tuple:
+        return A, I, y_max
+
+    @classmethod
+    def get_parameters(cls) -> dict[str, str]:
+        return {
+            'A': '截面积',
+            'I': '惯性矩',
+            'y_max': 'y方向上的最大距离'
+        }
+
+    @classmethod
+    def derivatives(cls, A, I, y_max) -> dict[str, tuple]:
+        return {
+            'A': (1.0, 0.0, 0.0),
+            'I': (0.0, 1.0, 0.0),
+            'y_max': (0.0, 0.0, 1.0)
+        }
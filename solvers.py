@@ -0,0 +1,171 @@
+import time
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve, lu_factor, lu_solve
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import splu, spilu, cg, LinearOperator
+
+
+class DirectSolver:
+    def __init__(self, K_ff, dense=False, permc_spec='MMD_AT_PLUS_A'):
+        """
+        对自由度刚度矩阵进行一次分解，之后可对任意多个右端项重复求解
+
+        K_ff 对称正定：稠密时使用 Cholesky 分解；稀疏时使用 SuperLU 的对称模式
+        （默认对 Aᵀ+A 做最小度排序、优先取对角主元），效果等同于 LDLᵀ 分解。
+
+        Args:
+            K_ff: 自由度对应的刚度矩阵（稀疏矩阵或稠密数组）
+            dense: 为 True 时使用稠密分解，否则使用稀疏分解
+            permc_spec: 稀疏分解的列排序方式，K_ff 已按填充减少排序编号时传入 'NATURAL'
+
+        """
+        self.dense = dense
+        self.n = K_ff.shape[0]
+
+        start = time.perf_counter()
+        if dense:
+            self.factor = cho_factor(K_ff)
+            self.factor_nnz = self.n * (self.n + 1) // 2
+        else:
+            self.factor = splu(K_ff.tocsc(),
+                               permc_spec=permc_spec,
+                               diag_pivot_thresh=0.0,
+                               options={'SymmetricMode': True})
+            self.factor_nnz = self.factor.L.nnz + self.factor.U.nnz
+        self.factor_time = time.perf_counter() - start  # 分解耗时（秒）
+
+    def solve(self, b):
+        """
+        利用已有分解求解 K_ff x = b
+
+        Args:
+            b: 右端项，可以是 (n,) 或 (n, m) 数组（多个右端项一次求解）
+
+        Returns:
+            与 b 形状相同的解
+
+        """
+        if self.dense:
+            return cho_solve(self.factor, b)
+        return self.factor.solve(np.asarray(b, dtype=float))
+
+
+class WoodburySolver:
+    def __init__(self, base, dofs, C):
+        """
+        基于基准矩阵分解的低秩修正求解器（Sherman–Morrison–Woodbury），求解 (K0 + Uᵀ·C·U) x = b，
+        其中 U 为选取 dofs 的选择矩阵。每次求解只需调用基准分解 1 次，构造时调用 len(dofs) 次。
+
+        Args:
+            base: 基准矩阵 K0 的求解器（具有 solve 方法）
+            dofs: (m,) 刚度发生变化的自由度
+            C: (m, m) 刚度增量在这些自由度上的子块
+
+        """
+        self.base = base
+        self.dofs = np.asarray(dofs)
+        self.C = C
+        self.n = base.n
+
+        m = len(self.dofs)
+        E = np.zeros((self.n, m))
+        E[self.dofs, np.arange(m)] = 1.0
+
+        # Z = K0⁻¹·Uᵀ，S = I + C·U·Z
+        self.Z = base.solve(E).reshape(self.n, m)
+        self.S = lu_factor(np.eye(m) + C @ self.Z[self.dofs])
+
+    def solve(self, b):
+        """
+        求解修正后的方程组
+
+        Args:
+            b: 右端项，可以是 (n,) 或 (n, m) 数组
+
+        Returns:
+            与 b 形状相同的解
+
+        """
+        x0 = self.base.solve(b)
+        y = lu_solve(self.S, self.C @ x0[self.dofs])
+        return x0 - self.Z @ y
+
+
+class IterativeSolver:
+    def __init__(self, K_ff, preconditioner='jacobi', rtol=1e-10, maxiter=None, groups=None,
+                 drop_tol=1e-4, fill_factor=10):
+        """
+        预条件共轭梯度求解器，不分解 K_ff，内存只与非零元数成正比，适用于直接分解内存不足的大模型
+
+        Args:
+            K_ff: 自由度对应的稀疏刚度矩阵（对称正定），或具有 diagonal 方法的 LinearOperator（无矩阵模式）
+            preconditioner: 'jacobi'（对角）、'block_jacobi'（按 groups 分块的块对角）、'ic'（不完全分解）或 None
+            rtol: 相对残差收敛容差 ||r|| <= rtol·||b||
+            maxiter: 最大迭代次数，None 时为 10·n
+            groups: (n,) 各自由度所属的块编号（通常为节点编号），block_jacobi 时使用
+            drop_tol: 不完全分解的丢弃容差
+            fill_factor: 不完全分解允许的填充倍数
+
+        """
+        self.K = K_ff if isinstance(K_ff, LinearOperator) else csr_matrix(K_ff)
+        self.n = self.K.shape[0]
+        self.rtol = rtol
+        self.maxiter = maxiter
+        self.iterations = []  # 每个右端项的迭代次数
+
+        if isinstance(self.K, LinearOperator) and preconditioner not in (None, 'jacobi'):
+            raise ValueError(f"Preconditioner '{preconditioner}' needs an assembled matrix")
+
+        if preconditioner is None:
+            self.M = None
+        elif preconditioner == 'jacobi':
+            d = 1.0 / self.K.diagonal()
+            self.M = LinearOperator((self.n, self.n), matvec=lambda x: d * x, dtype=float)
+        elif preconditioner == 'block_jacobi':
+            # 只保留同一块内的元素，块对角矩阵的分解没有填充
+            K = self.K.tocoo()
+            keep = groups[K.row] == groups[K.col]
+            B = csr_matrix((K.data[keep], (K.row[keep], K.col[keep])), shape=K.shape)
+            lu = splu(B.tocsc(), permc_spec='NATURAL', diag_pivot_thresh=0.0, options={'SymmetricMode': True})
+            self.M = LinearOperator((self.n, self.n), matvec=lu.solve, dtype=float)
+        elif preconditioner == 'ic':
+            # SciPy 没有不完全 Cholesky，用对称模式的不完全 LU 代替；
+            # 先做对称对角缩放 D⁻¹ᐟ²·K·D⁻¹ᐟ²，否则轴向与弯曲刚度量级相差悬殊，丢弃准则会破坏预条件子的正定性
+            d = 1.0 / np.sqrt(self.K.diagonal())
+            K_scaled = self.K.multiply(d[:, None]).multiply(d[None, :]).tocsc()
+            ilu = spilu(K_scaled, drop_tol=drop_tol, fill_factor=fill_factor, permc_spec='MMD_AT_PLUS_A',
+                        diag_pivot_thresh=0.0, options={'SymmetricMode': True})
+            self.M = LinearOperator((self.n, self.n), matvec=lambda x: d * ilu.solve(d * x), dtype=float)
+        else:
+            raise ValueError(f"Unknown preconditioner: {preconditioner}")
+
+    def solve(self, b, x0=None):
+        """
+        用共轭梯度法求解 K_ff x = b
+
+        Args:
+            b: 右端项，可以是 (n,) 或 (n, m) 数组（多个右端项逐列求解）
+            x0: 初始值（热启动），形状与 b 相同，通常取上一设计的解
+
+        Returns:
+            与 b 形状相同的解
+
+        """
+        b = np.asarray(b, dtype=float)
+        if b.ndim == 2:
+            if b.shape[1] == 0:
+                return np.zeros_like(b)
+            return np.column_stack([self.solve(b[:, j], None if x0 is None else x0[:, j])
+                                    for j in range(b.shape[1])])
+
+        count = [0]
+
+        def callback(xk):
+            count[0] += 1
+
+        x, info = cg(self.K, b, x0=x0, rtol=self.rtol, atol=0.0, maxiter=self.maxiter, M=self.M,
+                     callback=callback)
+        self.iterations.append(count[0])
+        if info != 0:
+            raise RuntimeError(f"CG did not converge to rtol={self.rtol} in {count[0]} iterations")
+        return x
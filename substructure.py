@@ -0,0 +1,94 @@
+import numpy as np
+from solvers import DirectSolver
+
+
+class Substructure:
+    def __init__(self, frame, boundary_nodes):
+        """
+        可重复使用的子结构（超单元）：把模板模型的内部自由度静力凝聚到边界自由度上
+
+        凝聚结果 K_bb* = K_bb − K_biK_ii⁻¹K_ib 与 F_b* = F_b − K_biK_ii⁻¹F_i 带缓存，模板截面或荷载不变时只计算一次；
+        同一个子结构可以通过 Frame2D.add_substructure 在宿主模型中多次放置（只平移、不旋转）。
+
+        Args:
+            frame: 子结构模板（Frame2D 对象），其支座只用于约束内部节点，荷载会被凝聚到边界上
+            boundary_nodes: 边界节点编号列表（从 1 开始），其余节点为内部节点
+
+        """
+        self.frame = frame
+        self.boundary_nodes = list(boundary_nodes)
+        self._condensed = None
+
+    def _dofs(self):
+        """
+        Returns:
+            boundary: (3·n_boundary,) 边界自由度，按 boundary_nodes 顺序排列
+            interior: 未被约束的内部自由度
+
+        """
+        self.frame._check_compiled()
+        nodes = np.array(self.boundary_nodes, dtype=int) - 1
+        boundary = (3 * nodes[:, None] + np.arange(3)).ravel()
+
+        interior = ~self.frame.fixed_mask
+        interior[boundary] = False
+        return boundary, np.flatnonzero(interior)
+
+    def condense(self):
+        """
+        计算（或从缓存读取）凝聚到边界自由度上的刚度矩阵和荷载向量
+
+        Returns:
+            K_cond: (n_b, n_b) 凝聚刚度矩阵
+            F_cond: (n_b,) 凝聚荷载向量
+
+        """
+        K = self.frame.cal_K_total()
+        F = self.frame.F
+
+        # 模板的总刚对象只在模型改变时重建，据此判断刚度是否改变；荷载向量在编译后会被原地修改，只能比较数值
+        cached = self._condensed
+        if cached is None or cached['K'] is not K or not np.array_equal(cached['F'], F):
+            boundary, interior = self._dofs()
+            K_ii = K[interior][:, interior]
+            K_ib = K[interior][:, boundary].toarray()
+            K_bb = K[boundary][:, boundary].toarray()
+
+            # 没有内部自由度时子结构即普通单元组，凝聚结果就是 K_bb 与 F_b
+            solver = DirectSolver(K_ii) if len(interior) else None
+            X = (solver.solve(np.column_stack([K_ib, F[interior]])).reshape(len(interior), -1) if solver
+                 else np.zeros((0, len(boundary) + 1)))
+            K_cond = K_bb - K_ib.T @ X[:, :-1]
+
+            cached = self._condensed = {'K': K, 'F': F.copy(), 'solver': solver, 'K_ib': K_ib,
+                                        'K_cond': (K_cond + K_cond.T) / 2,
+                                        'F_cond': F[boundary] - K_ib.T @ X[:, -1]}
+
+        return cached['K_cond'], cached['F_cond']
+
+    def recover(self, U_b):
+        """
+        由边界位移恢复模板模型的全部节点位移 U_i = K_ii⁻¹(F_i − K_ib U_b)
+
+        Args:
+            U_b: (3·n_boundary,) 边界节点位移，按 boundary_nodes 顺序排列
+
+        Returns:
+            (n_dof,) 模板模型的节点位移
+
+        """
+        self.condense()
+        boundary, interior = self._dofs()
+        cached = self._condensed
+
+        U = np.zeros(len(self.frame.F))
+        U[boundary] = U_b
+        if len(interior):
+            U[interior] = cached['solver'].solve(self.frame.F[interior] - cached['K_ib'] @ U_b)
+        return U
+
+    def __getstate__(self):
+        # 分解对象无法 pickle，凝聚结果在需要时重新计算
+        state = self.__dict__.copy()
+        state['_condensed'] = None
+        return state
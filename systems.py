@@ -1,11 +1,26 @@
 import numpy as np
-from numpy import sin, cos
-import matplotlib.pyplot as plt
-from matplotlib.widgets import Slider
-from scipy.interpolate import CubicHermiteSpline
+from scipy.sparse import csr_matrix, csc_matrix, identity
+from scipy.linalg import eigh
+from scipy.sparse.linalg import splu, eigsh, LinearOperator
 from elements import Node, Beam
-from matrices import transfer_matrix
+from matrices import K_beam_local_batch, M_beam_batch, transfer_matrix_batch
 from section import Section
+from solvers import DirectSolver, WoodburySolver, IterativeSolver
+from assembly import sparse_pattern, affine_operator, ElementOperator
+from aggregation import ks, p_norm
+
+# 各类模型改动会使哪些缓存失效
+_STIFFNESS_CACHE = ('K', 'factor', 'factor_dense', 'U', 'element_force', 'load_cases', 'modes')
+_LOAD_CACHE = ('U', 'element_force', 'load_cases')
+
+# 编译后模型的数组属性，由 export_arrays/from_arrays 在进程间传递
+_MODEL_ARRAYS = ('coords', 'connectivity', 'element_dof', 'fixed_mask', 'free_dof', 'free_index', 'F', 'F_cases',
+                 'L', 'Phi', 'E', 'rho', 'A', 'I', 'y_max', 'family_id', 'family_row')
+_UNIT_STIFFNESS = ('Ka_local', 'Kb_local', 'Ka_global', 'Kb_global', 'T')
+
+# 求解设置，随 export_arrays 的 meta 一起传递，使重建的模型与原模型按相同方式求解
+_SOLVER_SETTINGS = ('dof_ordering', 'incremental', 'max_incremental_elements', 'iterative', 'cg_preconditioner',
+                    'cg_rtol', 'cg_maxiter', 'matrix_free')
 
 
 class Frame2D:
@@ -14,7 +29,65 @@ class Frame2D:
         self.elements: list[Beam] = []
         self.FnM: list[float] = []
         self.fixed_dof: list[int] = []
-        # self.node_indices = []
+        self.node_index: dict[Node, int] = {}  # 节点对象 -> 节点序号（从 0 开始）
+        self.element_index: dict[Beam, int] = {}  # 单元对象 -> 单元序号（从 0 开始）
+        self.load_cases: dict[str, dict[int, float]] = {}  # 工况名 -> {自由度: 荷载}
+        self.substructures: list[tuple] = []  # (子结构, 宿主中对应边界节点的自由度)
+        self.design_groups: list[tuple[str, np.ndarray]] = []  # 设计变量分组：(形状参数名, 单元序号数组)，每组一个设计变量
+
+        # 由 compile() 生成的连续数组
+        self.compiled = False
+        self.coords = None  # (n_node, 2) 节点坐标
+        self.connectivity = None  # (n_elem, 2) 单元两端的节点序号
+        self.element_dof = None  # (n_elem, 6) 单元自由度映射
+        self.fixed_mask = None  # (n_dof,) 约束自由度掩码（已去重）
+        self.free_dof = None  # (n_free,) 自由自由度排列
+        self.free_index = None  # (n_dof,) 自由度 -> 在 free_dof 中的位置，约束自由度为 -1
+        self.F = None  # (n_dof,) 节点荷载向量
+        self.L = None  # (n_elem,) 单元长度
+        self.Phi = None  # (n_elem,) 单元偏转角
+
+        # 单元截面性质存储（结构数组），编译时由新加入的单元补充，之后可用 set_shape_params 整体写入
+        self.E = np.zeros(0)  # (n_elem,) 杨氏模量
+        self.rho = np.zeros(0)  # (n_elem,) 质量密度
+        self.A = np.zeros(0)  # (n_elem,) 截面积
+        self.I = np.zeros(0)  # (n_elem,) 惯性矩
+        self.y_max = np.zeros(0)  # (n_elem,) y方向上的最大距离
+        self.shape_families: list[type] = []  # 形状族（Shape 子类）
+        self.shape_params: list[np.ndarray] = []  # 每个形状族的参数数组 (n_member, n_param)，列顺序同 get_parameters()
+        self.family_id = np.zeros(0, dtype=int)  # (n_elem,) 单元所属形状族
+        self.family_row = np.zeros(0, dtype=int)  # (n_elem,) 单元在所属形状族参数数组中的行号
+        self.case_names = None  # 工况名列表，与 F_cases 的列一一对应
+        self.F_cases = None  # (n_dof, n_case) 工况荷载矩阵
+
+        # 增量重分析：少数单元截面改变时，在基准分解上做低秩修正而不重新分解
+        self.incremental = False
+        self.max_incremental_elements = 10  # 超过该数目的单元改变时自动重新分解
+
+        # 迭代求解：以预条件共轭梯度代替直接分解，并用上一设计的位移热启动
+        self.iterative = False
+        self.cg_preconditioner = 'ic'  # 'jacobi'、'block_jacobi'（按节点分块）、'ic'（不完全分解）或 None
+        self.cg_rtol = 1e-10  # 相对残差收敛容差
+        self.cg_maxiter = None  # 最大迭代次数
+        self.matrix_free = False  # 迭代求解时不组装 K_ff，使用逐单元算子（仅支持 'jacobi' 或 None 预条件）
+
+        # 编译时对自由自由度重新编号：'rcm'（逆 Cuthill–McKee，减小带宽）、'mmd'（最小度）或 None（按节点顺序）
+        # None 时稀疏分解每次自行做最小度排序，填充与 'mmd' 相同；'mmd' 在编译时额外做一次完整的数值分解来取得排序，
+        # 只在同一模型需要多次重新分解（例如优化迭代）时才值得开启。结果数组始终按原节点编号给出；修改后在下次编译时生效
+        self.dof_ordering = None
+
+        # 分析结果缓存（总刚、分解、位移、单元节点力）及命中统计
+        self._cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        self.rebuilt = False  # 由 from_arrays 重建的模型没有 Node/Beam 对象，不能重新编译
+
+    def __getstate__(self):
+        # 分解对象无法 pickle，且重新计算的代价远小于传输，因此不传递缓存
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        return state
 
     def add_node(self,
                  x: float,
@@ -27,8 +100,11 @@ class Frame2D:
             y: y 坐标
 
         """
-        self.nodes.append(Node(x, y))
+        node = Node(x, y)
+        self.node_index[node] = len(self.nodes)
+        self.nodes.append(node)
         self.FnM += [0.0, 0.0, 0.0]  # 给节点力向量分配自由度
+        self.invalidate('topology')
 
     def add_element(self,
                     node1_id: int,
@@ -54,118 +130,873 @@ class Frame2D:
                     section)
 
         # 添加新的梁
+        beam.system = self
+        self.element_index[beam] = len(self.elements)
         self.elements.append(beam)
+        self.invalidate('topology')
 
     def add_single_force(self,
                          node_id: int,
                          Fx=0.0,
-                         Fy=0.0):
+                         Fy=0.0,
+                         case: str = None):
         """
         添加节点力
         Args:
             node_id: 节点编号
             Fx: x 方向力
             Fy: y 方向力
+            case: 工况名，为 None 时加到基本荷载 FnM 上
 
         """
 
         i = node_id - 1
-        self.FnM[3 * i], self.FnM[3 * i + 1] = Fx, Fy
+        if case is not None:
+            self._set_case_load(case, {3 * i: Fx, 3 * i + 1: Fy})
+            return
 
-    def add_single_moment(self, node_id: int, M=0.0):
+        self._set_base_load({3 * i: Fx, 3 * i + 1: Fy})
+
+    def add_single_moment(self, node_id: int, M=0.0, case: str = None):
         """
         添加集中弯矩
 
         Args:
             node_id: 节点编号
             M: 弯矩，正负表示方向
+            case: 工况名，为 None 时加到基本荷载 FnM 上
 
         """
 
         i = node_id - 1
-        self.FnM[3 * i + 2] = M
+        if case is not None:
+            self._set_case_load(case, {3 * i + 2: M})
+            return
+
+        self._set_base_load({3 * i + 2: M})
+
+    def add_substructure(self, substructure, *args):
+        """
+        按引用放置一个子结构实例：子结构的边界节点依次与宿主中已有的节点对应，
+        其凝聚刚度与凝聚荷载在组装时叠加到这些节点的自由度上，内部自由度不进入宿主的 K_ff
+
+        实例只能由模板平移得到（不旋转）。修改模板的截面或荷载后需调用宿主的 invalidate()。
+
+        Args:
+            substructure: Substructure 对象，可在多个位置重复放置
+            *args: 宿主节点编号（从 1 开始），与 substructure.boundary_nodes 一一对应
+
+        """
+        if len(args) != len(substructure.boundary_nodes):
+            raise ValueError(f"Substructure has {len(substructure.boundary_nodes)} boundary nodes, got {len(args)}")
+        if min(args) < 1 or max(args) > len(self.nodes):
+            raise ValueError("Substructure boundary nodes do not exist in the host frame")
+
+        nodes = np.array(args, dtype=int) - 1
+        self.substructures.append((substructure, (3 * nodes[:, None] + np.arange(3)).ravel()))
+        self.invalidate('topology')
+
+    def add_load_case(self, name: str):
+        """
+        添加一个空的荷载工况，之后可通过 add_single_force(..., case=name) 等方法施加荷载
+
+        Args:
+            name: 工况名
+
+        """
+        if name in self.load_cases:
+            return
+        self.load_cases[name] = {}
+        # 拓扑不变，只给荷载矩阵追加一列，总刚与分解缓存仍然有效
+        if self.compiled:
+            self.case_names.append(name)
+            self.F_cases = np.column_stack([self.F_cases, np.zeros(len(self.F_cases))])
+        self.invalidate('load')
+
+    def _set_base_load(self, loads):
+        # 编译后的 F 中还叠加了子结构的凝聚荷载，只能按增量修改，不能直接覆盖
+        for dof, value in loads.items():
+            if self.compiled:
+                self.F[dof] += value - self.FnM[dof]
+            self.FnM[dof] = value
+        self.invalidate('load')
+
+    def _set_case_load(self, name, loads):
+        if name not in self.load_cases:
+            self.add_load_case(name)
+        self.load_cases[name].update(loads)
+        if self.compiled:
+            j = self.case_names.index(name)
+            for dof, value in loads.items():
+                self.F_cases[dof, j] = value
+        self.invalidate('load')
 
     def add_fixed_sup(self, *args):
         """添加固定支座"""
         for node_id in args:
             i = node_id - 1
             self.fixed_dof += [3 * i, 3 * i + 1, 3 * i + 2]
+        self.invalidate('topology')
 
     def add_simple_sup(self, *args):
         """添加简单支座"""
         for node_id in args:
             i = node_id - 1
             self.fixed_dof += [3 * i, 3 * i + 1]
+        self.invalidate('topology')
+
+    def compile(self):
+        """
+        冻结模型拓扑，生成分析所用的连续 NumPy 数组
+
+        生成节点坐标、单元连接关系、单元自由度映射、去重后的约束自由度掩码、自由自由度排列和节点荷载向量。
+        添加节点、单元、荷载或支座后模型会被标记为未编译，分析方法会在需要时自动重新编译。
+
+        Returns:
+            self
+
+        """
+        if self.rebuilt:
+            raise RuntimeError("A model rebuilt by from_arrays cannot be recompiled; "
+                               "nodes, elements and supports can only be changed on the original model")
+        n_dof = len(self.FnM)
+
+        self.coords = np.array([[node.x, node.y] for node in self.nodes], dtype=float).reshape(-1, 2)
+        self.connectivity = np.array([[self.node_index[element.node1], self.node_index[element.node2]]
+                                      for element in self.elements], dtype=int).reshape(-1, 2)
+        self.element_dof = 3 * self.connectivity[:, [0, 0, 0, 1, 1, 1]] + np.array([0, 1, 2, 0, 1, 2])
+
+        # 单元几何与材料数组
+        d = self.coords[self.connectivity[:, 1]] - self.coords[self.connectivity[:, 0]]
+        self.L = np.hypot(d[:, 0], d[:, 1])
+        self.Phi = np.arctan2(d[:, 1], d[:, 0])
+        self._extend_store()
+
+        self.fixed_mask = np.zeros(n_dof, dtype=bool)
+        self.fixed_mask[np.array(self.fixed_dof, dtype=int)] = True
+        free_dof = np.flatnonzero(~self.fixed_mask)
+        self.free_index = np.full(n_dof, -1)
+        self.free_index[free_dof] = np.arange(len(free_dof))
+        self.free_dof = free_dof[self._free_dof_ordering(free_dof)]
+        self.free_index[self.free_dof] = np.arange(len(free_dof))
+
+        self.F = np.array(self.FnM, dtype=float)
+        for substructure, dofs in self.substructures:
+            self.F[dofs] += substructure.condense()[1]
+
+        # 每个工况占荷载矩阵的一列
+        self.case_names = list(self.load_cases)
+        self.F_cases = np.zeros((n_dof, len(self.case_names)))
+        for j, name in enumerate(self.case_names):
+            for dof, value in self.load_cases[name].items():
+                self.F_cases[dof, j] = value
+
+        self.compiled = True
+        return self
+
+    def _check_compiled(self):
+        if not self.compiled:
+            self.compile()
+
+    def _require_monolithic(self, name):
+        """只按单元数组工作的方法不包含子结构的贡献，含子结构时直接报错"""
+        if self.substructures:
+            raise NotImplementedError(f"{name} does not support substructures")
+
+    def _free_dof_ordering(self, free_dof):
+        """
+        由 K_ff 的稀疏结构计算自由自由度的重新编号（调用时 free_index 仍按节点顺序编号）
+
+        Args:
+            free_dof: (n_free,) 按节点顺序排列的自由自由度
+
+        Returns:
+            (n_free,) 排列，free_dof[order] 即为新的自由自由度编号
+
+        """
+        n = len(free_dof)
+        if self.dof_ordering is None or n == 0:
+            return np.arange(n)
+
+        indptr, indices, _ = sparse_pattern(self.free_index[self.element_dof], n)
+        graph = csr_matrix((np.ones(len(indices)), indices, indptr), shape=(n, n))
+        for _, dofs in self.substructures:
+            d = self.free_index[dofs]
+            graph = graph + self._scatter(np.ones((len(d), len(d))), d, n)
+
+        if self.dof_ordering == 'rcm':
+            from scipy.sparse.csgraph import reverse_cuthill_mckee
+            return np.asarray(reverse_cuthill_mckee(graph, symmetric_mode=True))
+        if self.dof_ordering == 'mmd':
+            # 最小度排序只与结构有关，对一个对角占优的结构矩阵做一次符号 + 数值分解取出列排序；
+            # 这次分解的代价与一次真实分解相当，之后每次分解都省去排序
+            lu = splu((graph + n * identity(n)).tocsc(), permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+                      options={'SymmetricMode': True})
+            return np.argsort(lu.perm_c)
+        raise ValueError(f"Unknown DOF ordering: {self.dof_ordering}")
+
+    def _factorize(self, K_ff, dense=False):
+        """分解 K_ff；自由度已在编译时重新编号时，稀疏分解沿用该编号而不再重新排序"""
+        if dense:
+            return DirectSolver(K_ff.toarray(), dense=True)
+        return DirectSolver(K_ff, permc_spec='MMD_AT_PLUS_A' if self.dof_ordering is None else 'NATURAL')
+
+    def ordering_info(self, dense=False):
+        """
+        报告自由度编号的效果：K_ff 的带宽、非零元数、分解的非零元数（填充）与分解耗时
+
+        Args:
+            dense: 是否统计稠密分解
+
+        Returns:
+            字典，包含 ordering、n_free、bandwidth、nnz、factor_nnz、fill（factor_nnz / nnz）与 factor_time（秒）；
+            迭代求解时没有分解，后三项为 None
+
+        """
+        self._check_compiled()
+        if self.substructures:
+            # 子结构的凝聚块不在单元算子的结构里，按实际组装的 K_ff 统计
+            K_ff = self._assemble_K(free=True)
+            indptr, indices = K_ff.indptr, K_ff.indices
+        else:
+            indptr, indices, _, _ = self._assembly_operators()['K_ff']
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        info = {'ordering': self.dof_ordering,
+                'n_free': len(self.free_dof),
+                'bandwidth': int(np.abs(rows - indices).max()) if len(indices) else 0,
+                'nnz': len(indices),
+                'factor_nnz': None,
+                'fill': None,
+                'factor_time': None}
+
+        solver = self.get_solver(dense)
+        solver = getattr(solver, 'base', solver)  # 增量模式下统计基准分解
+        if isinstance(solver, DirectSolver):
+            info.update(factor_nnz=solver.factor_nnz,
+                        fill=solver.factor_nnz / max(info['nnz'], 1),
+                        factor_time=solver.factor_time)
+        return info
+
+    def _extend_store(self):
+        """把尚未进入截面性质存储的单元追加进去，已有单元的数据保持不变"""
+        new = self.elements[len(self.A):]
+        if not new:
+            return
+
+        self.E = np.concatenate([self.E, [element.section.material.E for element in new]])
+        self.rho = np.concatenate([self.rho, [element.section.material.rho for element in new]])
+        self.A = np.concatenate([self.A, [element.A for element in new]])
+        self.I = np.concatenate([self.I, [element.I for element in new]])
+        self.y_max = np.concatenate([self.y_max, [element.y_max for element in new]])
+
+        family_id, family_row, rows = [], [], {}
+        for element in new:
+            cls = type(element.section.shape)
+            if cls not in self.shape_families:
+                self.shape_families.append(cls)
+                self.shape_params.append(np.zeros((0, len(cls.get_parameters()))))
+            k = self.shape_families.index(cls)
+            rows.setdefault(k, []).append([element.shape_params[p] for p in cls.get_parameters()])
+            family_id.append(k)
+            family_row.append(len(self.shape_params[k]) + len(rows[k]) - 1)
+
+        for k, r in rows.items():
+            self.shape_params[k] = np.vstack([self.shape_params[k], np.array(r, dtype=float)])
+        self.family_id = np.concatenate([self.family_id, family_id]).astype(int)
+        self.family_row = np.concatenate([self.family_row, family_row]).astype(int)
+
+    def set_shape_params(self, elements=None, **params):
+        """
+        向量化地写入单元形状参数并更新截面性质存储，不创建 Shape 对象，也不调用 Beam.update
+
+        例如 s.set_shape_params(R=R) 一次写入所有圆截面单元的半径。写入后以存储为准，Beam 对象中的单元矩阵不会随之更新。
+
+        Args:
+            elements: 单元序号数组（从 0 开始），为 None 时表示全部单元
+            **params: 形状参数，值为标量或与 elements 等长的数组
+
+        """
+        self._check_compiled()
+        idx = np.arange(len(self.A)) if elements is None else np.atleast_1d(np.asarray(elements, dtype=int))
+
+        matched, changed = set(), False
+        for k, cls in enumerate(self.shape_families):
+            names = list(cls.get_parameters())
+            sel = self.family_id[idx] == k
+            if not sel.any() or not any(name in params for name in names):
+                continue
+
+            members = idx[sel]
+            rows = self.family_row[members]
+            old = self.shape_params[k][rows]
+            for name, value in params.items():
+                if name in names:
+                    matched.add(name)
+                    self.shape_params[k][rows, names.index(name)] = np.broadcast_to(value, idx.shape)[sel]
+
+            # 参数未改变时保留缓存，目标函数与约束在同一设计点上求值时不会重复分析
+            if np.array_equal(old, self.shape_params[k][rows]):
+                continue
+            changed = True
+            self.A[members], self.I[members], self.y_max[members] = cls.kernel(self.shape_params[k][rows]).T
+
+        unknown = set(params) - matched
+        if unknown:
+            raise ValueError(f"No selected element has shape parameter(s): {', '.join(sorted(unknown))}")
+
+        if changed:
+            self.invalidate('stiffness')
+
+    def element_shape_params(self, element: Beam):
+        """
+        读取某个单元在截面性质存储中的形状参数
+
+        Args:
+            element: 单元对象
+
+        Returns:
+            {参数名: 参数值}；单元尚未进入存储时为其自身的快照
+
+        """
+        i = self.element_index.get(element)
+        if i is None or i >= len(self.A):
+            return element.shape_params
+        cls = self.shape_families[self.family_id[i]]
+        return dict(zip(cls.get_parameters(), self.shape_params[self.family_id[i]][self.family_row[i]]))
+
+    def get_shape_params(self, param):
+        """
+        读取各单元的某个形状参数
+
+        Args:
+            param: 形状参数名
+
+        Returns:
+            (n_elem,) 数组，不含该参数的单元为 nan
+
+        """
+        self._check_compiled()
+        values = np.full(len(self.A), np.nan)
+        for k, cls in enumerate(self.shape_families):
+            names = list(cls.get_parameters())
+            if param in names:
+                members = np.flatnonzero(self.family_id == k)
+                values[members] = self.shape_params[k][self.family_row[members], names.index(param)]
+        return values
+
+    def export_arrays(self):
+        """
+        导出编译后的模型数组：拓扑、荷载、截面性质存储、单位刚度矩阵堆叠、稀疏模式及仿射算子
+
+        Returns:
+            arrays: {名称: ndarray}
+            meta: 重建模型所需的少量非数组信息
+
+        """
+        self._require_monolithic('export_arrays')
+        self._check_compiled()
+        arrays = {name: getattr(self, name) for name in _MODEL_ARRAYS}
+        for k, params in enumerate(self.shape_params):
+            arrays[f'shape_params_{k}'] = params
+        arrays.update(zip(_UNIT_STIFFNESS, self._unit_stiffness()))
+
+        shapes = {}
+        for key, (indptr, indices, P_A, P_I) in self._assembly_operators().items():
+            arrays[f'{key}_indptr'], arrays[f'{key}_indices'] = indptr, indices
+            for op_name, op in (('P_A', P_A), ('P_I', P_I)):
+                arrays[f'{key}_{op_name}_data'] = op.data
+                arrays[f'{key}_{op_name}_indices'] = op.indices
+                arrays[f'{key}_{op_name}_indptr'] = op.indptr
+            shapes[key] = P_A.shape
+
+        meta = {'shape_families': list(self.shape_families),
+                'settings': {name: getattr(self, name) for name in _SOLVER_SETTINGS},
+                'case_names': list(self.case_names),
+                'design_groups': [(param, elements.copy()) for param, elements in self.design_groups],
+                'operator_shapes': shapes}
+        return arrays, meta
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        """
+        由 export_arrays 的结果重建只用于分析的模型，不含 Node/Beam 对象，数组不复制
+
+        重建的模型沿用原模型的求解设置，可以修改截面参数、荷载（包括新增工况）并进行分析，
+        但不能再添加节点、单元或支座（需要重新编译的改动会引发 RuntimeError）。
+
+        Args:
+            arrays: {名称: ndarray}
+            meta: export_arrays 返回的非数组信息
+
+        Returns:
+            Frame2D 对象
+
+        """
+        frame = cls()
+        for name in _MODEL_ARRAYS:
+            setattr(frame, name, arrays[name])
+        frame.shape_families = list(meta['shape_families'])
+        frame.shape_params = [arrays[f'shape_params_{k}'] for k in range(len(frame.shape_families))]
+        frame.case_names = list(meta['case_names'])
+        frame.design_groups = [(param, np.array(elements)) for param, elements in meta['design_groups']]
+        for name, value in meta['settings'].items():
+            setattr(frame, name, value)
+        frame.load_cases = {name: {} for name in frame.case_names}
+        frame.FnM = frame.F.tolist()
+        frame.compiled = True
+        frame.rebuilt = True
+
+        frame._cache['unit_stiffness'] = tuple(arrays[name] for name in _UNIT_STIFFNESS)
+        operators = {}
+        for key, shape in meta['operator_shapes'].items():
+            operators[key] = (arrays[f'{key}_indptr'], arrays[f'{key}_indices'],
+                              *(csr_matrix((arrays[f'{key}_{op_name}_data'],
+                                            arrays[f'{key}_{op_name}_indices'],
+                                            arrays[f'{key}_{op_name}_indptr']), shape=shape)
+                                for op_name in ('P_A', 'P_I')))
+        frame._cache['assembly'] = operators
+
+        return frame
+
+    def add_design_group(self, param: str, *args):
+        """
+        添加一个设计变量：组内所有单元的形状参数 param 共用同一个值（例如同一层的所有柱、桁架的所有弦杆）
+
+        Args:
+            param: 形状参数名，例如圆截面的 'R'
+            *args: 单元编号（从 1 开始）
+
+        """
+        elements = np.array(args, dtype=int) - 1
+        if len(elements) == 0 or elements.min() < 0 or elements.max() >= len(self.elements):
+            raise ValueError("Design group elements do not exist")
+        if not np.isin(elements, self.param_elements(param)).all():
+            raise ValueError(f"Design group contains element(s) whose shape has no parameter '{param}'")
+        for other_param, other in self.design_groups:
+            if other_param == param and np.intersect1d(other, elements).size:
+                raise ValueError(f"Element(s) already linked to another '{param}' design variable")
+
+        self.design_groups.append((param, elements))
+
+    def linking_matrix(self, param):
+        """
+        设计变量到单元形状参数 param 的稀疏连接矩阵 P，单元参数 p = P @ x（只对受设计变量控制的单元有效）
+
+        Args:
+            param: 形状参数名
+
+        Returns:
+            n_elem × n_var 的 CSR 稀疏矩阵
+
+        """
+        self._check_compiled()
+        rows, cols = [], []
+        for j, (group_param, elements) in enumerate(self.design_groups):
+            if group_param == param:
+                rows.append(elements)
+                cols.append(np.full(len(elements), j))
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=int)
+        cols = np.concatenate(cols) if cols else np.zeros(0, dtype=int)
+
+        return csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(self.A), len(self.design_groups)))
+
+    def set_design(self, x):
+        """
+        由短设计向量写入各分组单元的形状参数
+
+        Args:
+            x: (n_var,) 设计向量，顺序与 add_design_group 的调用顺序一致
+
+        """
+        x = np.asarray(x, dtype=float)
+        if len(x) != len(self.design_groups):
+            raise ValueError(f"Design vector has {len(x)} entries but {len(self.design_groups)} groups are defined")
+
+        for param in dict.fromkeys(param for param, _ in self.design_groups):
+            P = self.linking_matrix(param)
+            elements = np.unique(P.tocoo().row)
+            self.set_shape_params(elements, **{param: (P @ x)[elements]})
+
+    def get_design(self):
+        """
+        读取当前设计向量（取每组第一个单元的参数值）
+
+        Returns:
+            (n_var,) 设计向量
 
-    def cal_K_total(self):
-        """计算总体刚度矩阵"""
+        """
+        return np.array([self.get_shape_params(param)[elements[0]] for param, elements in self.design_groups])
+
+    def design_gradient(self, func, **kwargs):
+        """
+        把对各单元形状参数的导数经连接矩阵链式转换为对设计变量的导数 Σ_param (df/dp)·P_param
+
+        例如 s.design_gradient(s.weight_gradient)、s.design_gradient(s.stress_jacobian)、
+        s.design_gradient(s.aggregate_stress_gradient, stress_ref=tol)。
+
+        Args:
+            func: 形如 func(param, **kwargs) 的导数函数，返回 (..., n_elem) 数组
+            **kwargs: 传给 func 的其它参数
+
+        Returns:
+            (..., n_var) 数组
+
+        """
+        grad = 0.0
+        for param in dict.fromkeys(param for param, _ in self.design_groups):
+            g = np.asarray(func(param, **kwargs))
+            grad = grad + (self.linking_matrix(param).T @ g.T).T
+        return grad
+
+    def param_elements(self, param):
+        """
+        含有形状参数 param 的单元序号
+
+        Args:
+            param: 形状参数名
 
-        # 初始化总刚
-        n = len(self.FnM)
-        K = np.zeros((n, n))
+        Returns:
+            按单元顺序排列的单元序号数组（从 0 开始）
 
-        for element in self.elements:
-            # 获取两节点的起始自由度编号
-            i, j = self.nodes.index(element.node1), self.nodes.index(element.node2)
+        """
+        self._check_compiled()
+        has_param = np.array([param in cls.get_parameters() for cls in self.shape_families], dtype=bool)
+        return np.flatnonzero(has_param[self.family_id]) if len(has_param) else np.zeros(0, dtype=int)
 
-            # 自由度索引
-            dof = [3 * i, 3 * i + 1, 3 * i + 2, 3 * j, 3 * j + 1, 3 * j + 2]
+    def invalidate(self, level='topology'):
+        """
+        标记模型已改变并清除受影响的缓存
 
-            Ke = element.K_global  # 单刚
+        Args:
+            level: 'topology' 表示节点、单元或支座改变（需要重新编译），
+                   'stiffness' 表示截面参数改变，'load' 表示荷载改变
 
-            for i in range(6):
-                for j in range(6):
-                    K[dof[i], dof[j]] += Ke[i, j]
+        """
+        if level == 'topology':
+            self.compiled = False
+            self._cache.clear()
+        elif level == 'stiffness':
+            for key in _STIFFNESS_CACHE:
+                self._cache.pop(key, None)
+        elif level == 'load':
+            for key in _LOAD_CACHE:
+                self._cache.pop(key, None)
+        else:
+            raise ValueError(f"Unknown invalidation level: {level}")
+
+    def on_element_update(self, element: Beam):
+        """单元截面改变后由 Beam.update 调用，同步该单元在截面性质存储中的数据"""
+        i = self.element_index.get(element)
+        if i is not None and i < len(self.A):
+            self.A[i], self.I[i], self.y_max[i] = element.A, element.I, element.y_max
+            cls = self.shape_families[self.family_id[i]]
+            self.shape_params[self.family_id[i]][self.family_row[i]] = [element.shape_params[p]
+                                                                         for p in cls.get_parameters()]
+        self.invalidate('stiffness')
+
+    def _cached(self, key, compute):
+        """从缓存中取出 key 对应的结果，缺失时调用 compute 计算并缓存"""
+        if key in self._cache:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def cache_info(self):
+        """
+        返回缓存命中统计
+
+        Returns:
+            包含 hits、misses 和当前已缓存条目的字典
+
+        """
+        return {'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'cached': sorted(self._cache)}
+
+    def cal_K_total(self, sparse=True):
+        """
+        计算总体刚度矩阵
+
+        将所有单刚堆叠为 (n_elem, 6, 6) 数组，配合 (n_elem, 6) 的自由度索引数组一次性散射到 COO 矩阵，
+        重复的 (行, 列) 项在转换为 CSR 时自动累加。
+
+        Args:
+            sparse: 为 True 时返回 CSR 稀疏矩阵，否则返回稠密矩阵（仅适用于小模型）
+
+        Returns:
+            n×n 总体刚度矩阵
+
+        """
+        self._check_compiled()
+        K = self._cached('K', self._assemble_K)
+
+        return K if sparse else K.toarray()
+
+    def _assemble_K(self, free=False):
+        """
+        由截面性质数组组装总刚（free 为 True 时只组装 K_ff）
+
+        单刚满足 K_e = A·Ka + I·Kb，因此总刚的 CSR data 为 P_A @ A + P_I @ I，只需两次稀疏矩阵向量乘
+        """
+        indptr, indices, P_A, P_I = self._assembly_operators()['K_ff' if free else 'K']
+        A, I, _ = self._section_arrays()
+        n = len(indptr) - 1
+        K = csr_matrix((P_A @ A + P_I @ I, indices, indptr), shape=(n, n))
+
+        # 子结构的凝聚刚度
+        if self.substructures:
+            for substructure, dofs in self.substructures:
+                K = K + self._scatter(substructure.condense()[0], self.free_index[dofs] if free else dofs, n)
+            K.sort_indices()
 
         return K
 
-    def solve_disp(self, tolerance=1e-10):
+    @staticmethod
+    def _scatter(block, dof, n):
+        """把稠密块 block 按自由度 dof 散射为 n×n 的 CSR 矩阵，dof 为 -1 的行列被忽略"""
+        keep = dof >= 0
+        rows, cols = np.meshgrid(dof[keep], dof[keep], indexing='ij')
+        return csr_matrix((block[np.ix_(keep, keep)].ravel(), (rows.ravel(), cols.ravel())), shape=(n, n))
+
+    def recover_substructure(self, index: int):
         """
-        求解节点位移
+        按需恢复某个子结构实例的内部结果
 
         Args:
-            tolerance: 小于该值的位移将会被认为是0
+            index: 子结构实例序号（按 add_substructure 的调用顺序，从 0 开始）
 
         Returns:
+            字典，包含
+                U: 该实例在模板编号下的全部节点位移
+                element_force: 模板各单元局部坐标系下的单元节点力
+
+        """
+        substructure, dofs = self.substructures[index]
+        U = substructure.recover(self.solve_disp(tolerance=0)[dofs])
+
+        return {'U': U, 'element_force': substructure.frame._element_forces(U)}
 
+    def _assemble_M(self, free=False):
         """
-        n = len(self.FnM)
-        free_dof = list((set(range(n)).difference(self.fixed_dof)))
+        由截面积数组组装总体质量矩阵（free 为 True 时只组装 M_ff），M 的 CSR data 为 P_M @ A
+        """
+        indptr, indices, P_M = self._mass_operators()['M_ff' if free else 'M']
+        n = len(indptr) - 1
+
+        return csr_matrix((P_M @ self.A, indices, indptr), shape=(n, n))
 
-        K = self.cal_K_total()
+    def element_operator(self, free=True):
+        """
+        不形成总刚的逐单元刚度算子，内存为 O(n_elem)
 
-        K_ff = K[np.ix_(free_dof, free_dof)]
-        F_f = np.array([self.FnM[i] for i in free_dof])
-        U_f = np.linalg.solve(K_ff, F_f)
+        Args:
+            free: 为 True 时为 K_ff 的算子（自由度按 free_dof 编号），否则为总刚的算子
 
-        U_f[np.abs(U_f) < tolerance] = 0
+        Returns:
+            ElementOperator 对象（scipy LinearOperator）
 
-        U = np.zeros(n)
-        U[free_dof] = U_f
+        """
+        self._require_monolithic('element_operator')
+        self._check_compiled()
+        A, I, _ = self._section_arrays()
+        _, _, Ka_global, Kb_global, _ = self._unit_stiffness()
+        Ke = A[:, None, None] * Ka_global + I[:, None, None] * Kb_global
+
+        if not free:
+            return ElementOperator(self.element_dof, Ke, len(self.F))
+        return ElementOperator(self.free_index[self.element_dof], Ke, len(self.free_dof))
+
+    def _mass_operators(self):
+        """
+        总体质量矩阵与 M_ff 的稀疏模式及仿射算子 P_M（单元一致质量矩阵与截面积成正比）
+
+        Returns:
+            {'M': (indptr, indices, P_M), 'M_ff': (indptr, indices, P_M), 'M_unit': 单位截面积的单元质量矩阵堆叠}
+
+        """
+        self._check_compiled()
+
+        def compute():
+            _, _, _, _, T = self._unit_stiffness()
+            M_unit = np.swapaxes(T, 1, 2) @ M_beam_batch(self.rho, 1.0, self.L) @ T
+
+
+            operators = {'M_unit': M_unit}
+            for key, dof, n in (('M', self.element_dof, len(self.F)),
+                                ('M_ff', self.free_index[self.element_dof], len(self.free_dof))):
+                indptr, indices, pos = sparse_pattern(dof, n)
+                operators[key] = (indptr, indices, affine_operator(pos, M_unit, len(indices)))
+            return operators
+
+        return self._cached('mass', compute)
+
+    def _assembly_operators(self):
+        """
+        总刚与 K_ff 的稀疏模式及仿射算子 P_A、P_I，只与几何和材料有关，每次编译后只生成一次
+
+        Returns:
+            {'K': (indptr, indices, P_A, P_I), 'K_ff': (indptr, indices, P_A, P_I)}
+
+        """
+        self._check_compiled()
+
+        def compute():
+            _, _, Ka_global, Kb_global, _ = self._unit_stiffness()
+
+            # 约束自由度在 K_ff 中被忽略
+
+            operators = {}
+            for key, dof, n in (('K', self.element_dof, len(self.F)),
+                                ('K_ff', self.free_index[self.element_dof], len(self.free_dof))):
+                indptr, indices, pos = sparse_pattern(dof, n)
+                operators[key] = (indptr, indices,
+                                  affine_operator(pos, Ka_global, len(indices)),
+                                  affine_operator(pos, Kb_global, len(indices)))
+            return operators
+
+        return self._cached('assembly', compute)
+
+    def _section_arrays(self):
+        """
+        各单元的截面性质
+
+        Returns:
+            A, I, y_max，均为 (n_elem,) 数组
+
+        """
+        self._check_compiled()
+        return self.A, self.I, self.y_max
+
+    def get_solver(self, dense=False):
+        """
+        获取 K_ff 的分解（带缓存）
+
+        Args:
+            dense: 是否使用稠密分解
+
+        Returns:
+            DirectSolver 对象；迭代模式下（且 dense 为 False）为 IterativeSolver 对象
+
+        """
+        self._check_compiled()
+
+        def factorize():
+            if self.iterative and not dense:
+                K_ff = self.element_operator() if self.matrix_free else self._assemble_K(free=True)
+                return IterativeSolver(K_ff, preconditioner=self.cg_preconditioner,
+                                       rtol=self.cg_rtol, maxiter=self.cg_maxiter, groups=self.free_dof // 3)
+            if self.incremental:
+                return self._incremental_solver(dense)
+            return self._factorize(self._assemble_K(free=True), dense)
+
+        return self._cached('factor_dense' if dense else 'factor', factorize)
+
+    def _incremental_solver(self, dense=False):
+        """
+        增量模式下的求解器：与基准设计相比只有少数单元改变时，把改变视为秩不超过 6 的修正，
+        用 Sherman–Morrison–Woodbury 公式复用基准分解；改变过多时重新分解并更新基准
+
+        Returns:
+            DirectSolver 或 WoodburySolver 对象
+
+        """
+        key = 'baseline_dense' if dense else 'baseline'
+        A, I, _ = self._section_arrays()
+        baseline = self._cache.get(key)
+
+        if baseline is not None:
+            changed = np.flatnonzero((A != baseline['A']) | (I != baseline['I']))
+            if len(changed) == 0:
+                return baseline['solver']
+            if len(changed) <= self.max_incremental_elements:
+                # 改变单元的刚度增量 ΔK_e = ΔA·Ka + ΔI·Kb
+                _, _, Ka_global, Kb_global, _ = self._unit_stiffness()
+                dKe = ((A - baseline['A'])[changed, None, None] * Ka_global[changed] +
+                       (I - baseline['I'])[changed, None, None] * Kb_global[changed])
+
+                # 只保留自由自由度，并把增量组装到这些自由度构成的小矩阵 C 上
+                dof = self.free_index[self.element_dof[changed]]
+                dofs, local = np.unique(dof, return_inverse=True)
+                local = local.reshape(dof.shape)
+                keep = (dof[:, :, None] >= 0) & (dof[:, None, :] >= 0)
+                if dofs[0] < 0:
+                    dofs, local = dofs[1:], local - 1
+
+                C = np.zeros((len(dofs), len(dofs)))
+                rows = np.broadcast_to(local[:, :, None], dKe.shape)
+                cols = np.broadcast_to(local[:, None, :], dKe.shape)
+                np.add.at(C, (rows[keep], cols[keep]), dKe[keep])
+
+                return WoodburySolver(baseline['solver'], dofs, C)
+
+        solver = self._factorize(self._assemble_K(free=True), dense)
+        self._cache[key] = {'solver': solver, 'A': A.copy(), 'I': I.copy()}
+        return solver
+
+    def _solve_free(self, b, dense=False, warm_key=None):
+        """
+        求解 K_ff x = b；迭代模式下以缓存中 warm_key 对应的上一次解作为初值，并把本次解存回
+
+        截面参数或荷载改变时热启动值保留（只在拓扑改变时清除），相邻设计之间只需少量迭代；
+        形状与 b 不一致（例如新增了荷载工况）的旧解不作为初值
+        """
+        solver = self.get_solver(dense)
+        if not isinstance(solver, IterativeSolver):
+            return solver.solve(b)
+
+        x0 = self._cache.get(warm_key)
+        if x0 is not None and x0.shape != b.shape:
+            x0 = None
+        x = solver.solve(b, x0=x0)
+        self._cache[warm_key] = x
+        return x
+
+    def solve_disp(self, tolerance=1e-10, dense=False):
+        """
+        求解节点位移
+
+        Args:
+            tolerance: 小于该值的位移将会被认为是0
+            dense: 为 True 时使用稠密矩阵和 np.linalg.solve，否则使用稀疏直接求解器
+
+        Returns:
+
+        """
+        self._check_compiled()
+
+        def solve():
+            U = np.zeros(len(self.F))
+            U[self.free_dof] = self._solve_free(self.F[self.free_dof], dense, 'warm_start')
+            return U
+
+        U = self._cached('U', solve).copy()
+        U[np.abs(U) < tolerance] = 0
 
         return U
 
-    def solve_reaction(self, tolerance=1e-10):
+    def solve_reaction(self, tolerance=1e-10, dense=False):
         """
         求解反力
 
         Args:
             tolerance: 小于该值的力将会被认为是0
+            dense: 是否使用稠密矩阵求解
 
         Returns:
 
         """
-        K = self.cal_K_total()
-        U = self.solve_disp()
+        K = self.cal_K_total(sparse=not dense)
+        U = self.solve_disp(dense=dense)
         Q = K @ U
-        f = np.array(self.FnM)
-        R = Q - f
+        R = Q - self.F
         R[np.abs(R) < tolerance] = 0
 
         return R
 
     def get_element_dof(self, element):
-        i, j = self.nodes.index(element.node1), self.nodes.index(element.node2)
+        i, j = self.node_index[element.node1], self.node_index[element.node2]
         element_dof = [3 * i, 3 * i + 1, 3 * i + 2, 3 * j, 3 * j + 1, 3 * j + 2]
         return element_dof
 
@@ -173,174 +1004,639 @@ class Frame2D:
         """
         求解单元的节点力
         """
-        U = self.solve_disp()
-        element_nodal_force_local = []
-        for element in self.elements:
-            # 获取单元的自由度索引
-            dof_ids = self.get_element_dof(element)
-            phi = element.Phi
-            K_local = element.K_local
-            # 转换矩阵
-            T_mat = transfer_matrix(phi)
-            # 全局坐标系下的单元节点位移解
-            u_global = U[dof_ids]
-            # 局部坐标下的单元节点位移解
-            u_local = T_mat @ u_global
-            # 局部坐标系下的单元节点力
-            f_local = K_local @ u_local
-            element_nodal_force_local.append(f_local)
-        return element_nodal_force_local
+        self._check_compiled()
+        return self._cached('element_force', lambda: self._element_forces(self.solve_disp())).copy()
+
+    def _element_forces(self, U):
+        """
+        由节点位移计算局部坐标系下的单元节点力
+
+        Args:
+            U: (n_dof,) 位移向量，或 (n_case, n_dof) 多工况位移
+
+        Returns:
+            (n_elem, 6) 或 (n_case, n_elem, 6) 单元节点力
+
+        """
+        # 全局坐标系下的单元节点位移解 (..., n_elem, 6)
+        u_global = U[..., self.element_dof]
+
+        # 转换矩阵与局部单刚堆叠
+        A, I, _ = self._section_arrays()
+        T_mat = transfer_matrix_batch(self.Phi)
+        K_local = K_beam_local_batch(self.E, A, I, self.L)
+
+        # 局部坐标下的单元节点位移解
+        u_local = np.einsum('eij,...ej->...ei', T_mat, u_global)
+        # 局部坐标系下的单元节点力
+        f_local = np.einsum('eij,...ej->...ei', K_local, u_local)
+
+        return f_local
+
+    def solve_load_cases(self, tolerance=1e-10, dense=False):
+        """
+        一次分解 K_ff，批量求解所有荷载工况
+
+        Args:
+            tolerance: 小于该值的位移和反力将会被认为是0
+            dense: 是否使用稠密分解
+
+        Returns:
+            字典，包含
+                names: 工况名列表
+                U: (n_dof, n_case) 各工况节点位移
+                R: (n_dof, n_case) 各工况支座反力
+                element_force: (n_case, n_elem, 6) 各工况局部坐标系下的单元节点力
+                envelope_max, envelope_min: (n_elem, 6) 单元节点力在所有工况上的包络
+
+        """
+        self._check_compiled()
+
+        def solve():
+            free_dof = self.free_dof
+            U = np.zeros_like(self.F_cases)
+            U[free_dof] = self._solve_free(self.F_cases[free_dof], dense, 'warm_start_cases').reshape(len(free_dof), -1)
+            U[np.abs(U) < tolerance] = 0
+
+            R = self.cal_K_total() @ U - self.F_cases
+            R[np.abs(R) < tolerance] = 0
+
+            element_force = self._element_forces(U.T)
+
+            return {'names': list(self.case_names),
+                    'U': U,
+                    'R': R,
+                    'element_force': element_force,
+                    'envelope_max': element_force.max(axis=0, initial=-np.inf),
+                    'envelope_min': element_force.min(axis=0, initial=np.inf)}
+
+        result = self._cached('load_cases', solve)
+        # 与 solve_disp 一致返回副本，调用者修改结果不会污染缓存
+        return {key: list(value) if key == 'names' else value.copy() for key, value in result.items()}
+
+    def get_element_stress(self, per_end=False):
+        """
+        向量化求解各单元的应力 |Fx/A| + |M|·y_max/I
+
+        Args:
+            per_end: 为 True 时返回单元两端各自的应力，否则返回每个单元两端中的较大值
+
+        Returns:
+            (n_elem,) 或 (n_elem, 2) 应力数组
+
+        """
+        f = self.cal_element_nodal_force()
+        A, I, y_max = self._section_arrays()
+
+        # 拉压应力与两端的弯曲应力
+        axial_stress = np.abs(f[:, 0] / A)
+        bend_stress = np.abs(f[:, [2, 5]] * y_max[:, None] / I[:, None])
+        stress = axial_stress[:, None] + bend_stress
+
+        return stress if per_end else stress.max(axis=1)
 
     def get_max_stress(self):
         """
-        求解单元最大应力数组
-        """
-        ele_max_stress = []
-        ele_nodal_force = self.cal_element_nodal_force()
-        for i, f_e in enumerate(ele_nodal_force):
-            # 获取单元的截面信息
-            A = self.elements[i].section.shape.A
-            I = self.elements[i].section.shape.I
-            y_max = self.elements[i].section.shape.y_max
-
-            # 获取计算应力需要用到的数据Fx, M1, M2
-            Fx = f_e[0]
-            M1 = f_e[2]
-            M2 = f_e[5]
-
-            # 拉压应力
-            axial_stress = abs(Fx / A)
-            # 弯曲应力
-            bend_stress = max(abs(M1 * y_max / I), abs(M2 * y_max / I))
-            # 最大总应力
-            stress = axial_stress + bend_stress
-            ele_max_stress.append(stress)
-
-        return max(ele_max_stress)
-
-    def plot_system(self, initial_scale=1.0, scale_max=1000.0):
-        # 计算节点位移
+        求解单元最大应力
+        """
+        return self.get_element_stress().max()
+
+    def get_weight(self):
+        """
+        求解结构总重量 Σ rho·A·L
+        """
+        self._check_compiled()
+        A, _, _ = self._section_arrays()
+        return np.sum(self.rho * A * self.L) + sum(substructure.frame.get_weight()
+                                                   for substructure, _ in self.substructures)
+
+    def _shape_derivatives(self, param):
+        """
+        各单元 A、I、y_max 对形状参数 param 的偏导数，不含该参数的单元导数为 0
+
+        Returns:
+            dA, dI, dy_max，均为 (n_elem,) 数组
+
+        """
+        self._check_compiled()
+        d = np.zeros((3, len(self.A)))
+        for k, cls in enumerate(self.shape_families):
+            names = list(cls.get_parameters())
+            if param not in names:
+                continue
+            members = np.flatnonzero(self.family_id == k)
+            _, jac = cls.kernel(self.shape_params[k][self.family_row[members]], derivatives=True)
+            d[:, members] = jac[:, :, names.index(param)].T
+        return d[0], d[1], d[2]
+
+    def _unit_stiffness(self):
+        """
+        单位截面积和单位惯性矩对应的单元刚度矩阵，单元刚度满足 K_e = A·Ka + I·Kb
+
+        Returns:
+            Ka_local, Kb_local, Ka_global, Kb_global, T，均为 (n_elem, 6, 6) 数组
+
+        """
+        self._check_compiled()
+
+        def compute():
+            Ka_local = K_beam_local_batch(self.E, 1.0, 0.0, self.L)
+            Kb_local = K_beam_local_batch(self.E, 0.0, 1.0, self.L)
+            T = transfer_matrix_batch(self.Phi)
+            T_t = np.swapaxes(T, 1, 2)
+            return Ka_local, Kb_local, T_t @ Ka_local @ T, T_t @ Kb_local @ T, T
+
+        return self._cached('unit_stiffness', compute)
+
+    def _end_stress_state(self):
+        """
+        单元两端的应力及其对单元节点位移的偏导数
+
+        Returns:
+            stress: (n_elem, 2) 单元两端的应力
+            dstress_du: (n_elem, 2, 6) 应力对全局坐标下单元节点位移的偏导数
+            bend_unit: (n_elem, 2) |M|/I，即弯曲应力对 y_max 的偏导数
+
+        """
+        Ka_local, Kb_local, _, _, T = self._unit_stiffness()
+        _, _, y_max = self._section_arrays()
+        u_e = self.solve_disp()[self.element_dof]
+
+        # Fx/A = Ka_local[0]·T·u_e，两端 M/I = Kb_local[2 或 5]·T·u_e
+        axial_row = np.einsum('ej,ejk->ek', Ka_local[:, 0, :], T)
+        bend_row = np.einsum('eaj,ejk->eak', Kb_local[:, [2, 5], :], T)
+        axial = np.einsum('ek,ek->e', axial_row, u_e)
+        bend = np.einsum('eak,ek->ea', bend_row, u_e)
+
+        bend_unit = np.abs(bend)
+        stress = np.abs(axial)[:, None] + bend_unit * y_max[:, None]
+        dstress_du = (np.sign(axial)[:, None, None] * axial_row[:, None, :] +
+                      (y_max[:, None] * np.sign(bend))[..., None] * bend_row)
+
+        return stress, dstress_du, bend_unit
+
+    def _stress_state(self):
+        """
+        单元最大应力（取两端中的较大值）及其对单元节点位移的偏导数
+
+        Returns:
+            stress: (n_elem,) 单元最大应力
+            dstress_du: (n_elem, 6) 单元最大应力对全局坐标下单元节点位移的偏导数
+            bend_unit: (n_elem,) |M|/I，即弯曲应力对 y_max 的偏导数
+
+        """
+        stress, dstress_du, bend_unit = self._end_stress_state()
+        e = np.arange(len(stress))
+        end = np.argmax(stress, axis=1)
+
+        return stress[e, end], dstress_du[e, end], bend_unit[e, end]
+
+    def _adjoint_gradient(self, dg_dU, param):
+        """
+        伴随法求 g(U) 经由位移对各单元形状参数的导数 -λᵀ·(∂K/∂p)·U，其中 K_ff·λ = ∂g/∂U
+
+        Args:
+            dg_dU: (n_dof,) 函数对全局位移的偏导数，或 (n_dof, m) 多个函数的偏导数（一次多右端项伴随求解）
+            param: 形状参数名
+
+        Returns:
+            (n_elem,) 或 (m, n_elem) 导数数组
+
+        """
+        dA, dI, _ = self._shape_derivatives(param)
+        _, _, Ka_global, Kb_global, _ = self._unit_stiffness()
+        dg_dU = np.asarray(dg_dU, dtype=float)
+
+        # 一次伴随求解
+        lam = np.zeros(dg_dU.shape)
+        lam[self.free_dof] = self.get_solver().solve(dg_dU[self.free_dof]).reshape(lam[self.free_dof].shape)
+
         U = self.solve_disp()
+        u_e = U[self.element_dof]
+        lam_e = lam[self.element_dof]
+
+        return -(dA * np.einsum('ei...,eij,ej->...e', lam_e, Ka_global, u_e) +
+                 dI * np.einsum('ei...,eij,ej->...e', lam_e, Kb_global, u_e))
+
+    def weight_gradient(self, param):
+        """
+        结构总重量对各单元形状参数的导数
+
+        Args:
+            param: 形状参数名，例如圆截面的 'R'
+
+        Returns:
+            (n_elem,) 数组，第 i 项为总重量对第 i 个单元参数的导数
+
+        """
+        self._check_compiled()
+        dA, _, _ = self._shape_derivatives(param)
+        return self.rho * self.L * dA
+
+    def stress_gradient(self, param, element_id: int = None):
+        """
+        伴随法求单元最大应力对各单元形状参数的导数，只需一次伴随求解
+
+        Args:
+            param: 形状参数名，例如圆截面的 'R'
+            element_id: 单元编号（从 1 开始），为 None 时取应力最大的单元，即 get_max_stress 的导数
+
+        Returns:
+            (n_elem,) 数组，第 i 项为该应力对第 i 个单元参数的导数
 
-        fig, ax = plt.subplots(figsize=(8, 8))
-        plt.subplots_adjust(left=0.1, bottom=0.3)  # 为滑动条留出空间
-
-        # 绘制原始结构
-        for i, element in enumerate(self.elements):
-            x_values = [element.node1.x, element.node2.x]
-            y_values = [element.node1.y, element.node2.y]
-            color = 'b'
-            ax.plot(x_values, y_values, color + '-', linewidth=3, label="Original" if i == 0 else "", alpha=0.6)
-            mid_x = (x_values[0] + x_values[1]) / 2
-            mid_y = (y_values[0] + y_values[1]) / 2
-            ax.text(mid_x, mid_y, f'({i + 1})', fontsize=10)
-
-        # 绘制节点
-        for i, node in enumerate(self.nodes):
-            ax.plot(node.x, node.y, 'ro')
-            ax.text(node.x, node.y, f'{i + 1}', fontsize=12)
-
-        # 设置节点坐标范围
-        node_x = [node.x for node in self.nodes]
-        node_y = [node.y for node in self.nodes]
-        x_min, x_max = min(node_x), max(node_x)
-        y_min, y_max = min(node_y), max(node_y)
-
-        # 设置坐标范围，并添加10%边距
-        x_margin = (x_max - x_min) * 0.2 if x_max != x_min else 0.2
-        y_margin = (y_max - y_min) * 0.2 if y_max != y_min else 0.2
-        ax.set_xlim(x_min - x_margin, x_max + x_margin)
-        ax.set_ylim(y_min - y_margin, y_max + y_margin)
-
-        # 设置图例、网格、比例和标题
-        ax.grid(True)
-        ax.set_aspect('equal')
-        plt.xlabel("X")
-        plt.ylabel("Y")
-        plt.title("Frame System Deformation Visualization")
-
-        # 创建滑动条，使用 scale_max 设置最大值
-        ax_scale = plt.axes((0.1, 0.1, 0.8, 0.03), facecolor='lightgoldenrodyellow')
-        scale_slider = Slider(ax_scale, 'Scale', 0.1, scale_max, valinit=initial_scale, valstep=0.1)
-
-        # 初始化变形后系统的绘制，只创建一次
-        deformed_lines = []
-        for i, _ in enumerate(self.elements):
-            if i == 0:
-                line, = ax.plot([], [], 'r--', linewidth=2, label="Deformed")
+        """
+        stress, dstress_du, bend_unit = self._stress_state()
+        e = int(np.argmax(stress)) if element_id is None else element_id - 1
+
+        dg_dU = np.zeros(len(self.F))
+        np.add.at(dg_dU, self.element_dof[e], dstress_du[e])
+
+        grad = self._adjoint_gradient(dg_dU, param)
+
+        # y_max 对应力的显式贡献
+        _, _, dy = self._shape_derivatives(param)
+        grad[e] += dy[e] * bend_unit[e]
+
+        return grad
+
+    def stress_jacobian(self, param, per_end=False):
+        """
+        各单元应力对各单元形状参数的雅可比矩阵，用于向量形式的应力约束；所有单元共用一次多右端项伴随求解
+
+        Args:
+            param: 形状参数名，例如圆截面的 'R'
+            per_end: 为 True 时按单元两端分别给出（与 get_element_stress(per_end=True) 对应）
+
+        Returns:
+            (n_elem, n_elem) 或 (2·n_elem, n_elem) 数组，第 i 行为第 i 个应力对各单元参数的导数
+
+        """
+        if per_end:
+            stress, dstress_du, bend_unit = self._end_stress_state()
+            element = np.repeat(np.arange(len(stress)), 2)
+            dstress_du, bend_unit = dstress_du.reshape(-1, 6), bend_unit.ravel()
+        else:
+            stress, dstress_du, bend_unit = self._stress_state()
+            element = np.arange(len(stress))
+        rows = np.arange(len(element))
+
+        dg_dU = np.zeros((len(self.F), len(rows)))
+        np.add.at(dg_dU, (self.element_dof[element], rows[:, None]), dstress_du)
+
+        jac = self._adjoint_gradient(dg_dU, param)
+
+        # y_max 对应力的显式贡献
+        _, _, dy = self._shape_derivatives(param)
+        jac[rows, element] += dy[element] * bend_unit
+
+        return jac
+
+    def _aggregate_state(self, stress_ref, method, rho, p, groups):
+        """
+        按组聚合单元两端的归一化应力 σ/stress_ref
+
+        Returns:
+            values: (n_group,) 各组聚合值
+            weights: (n_group, n_elem, 2) 聚合值对各端归一化应力的导数
+            dstress_du, bend_unit: 同 _end_stress_state
+
+        """
+        stress, dstress_du, bend_unit = self._end_stress_state()
+        x = stress / stress_ref
+        if groups is None:
+            groups = [np.arange(len(x))]
+
+        values = np.zeros(len(groups))
+        weights = np.zeros((len(groups),) + x.shape)
+        for g, members in enumerate(groups):
+            members = np.asarray(members, dtype=int)
+            if method == 'ks':
+                values[g], w = ks(x[members].ravel(), rho)
+            elif method == 'pnorm':
+                values[g], w = p_norm(x[members].ravel(), p)
             else:
-                line, = ax.plot([], [], 'r--', linewidth=2)
-            deformed_lines.append(line)
+                raise ValueError(f"Unknown aggregation method: {method}")
+            weights[g, members] = w.reshape(-1, 2)
+
+        return values, weights, dstress_du, bend_unit
+
+    def aggregate_stress(self, stress_ref, method='ks', rho=50.0, p=8.0, groups=None):
+        """
+        光滑的应力聚合约束值：把所有单元两端的归一化应力 σ/stress_ref 聚合为少数几个光滑量，
+        约束写为 1 − aggregate_stress(...) ≥ 0，代替逐单元的应力约束
+
+        Args:
+            stress_ref: 参考应力（通常为许用应力），聚合在归一化应力上进行
+            method: 'ks'（Kreisselmeier–Steinhauser，最大值的上界）或 'pnorm'（p 范数）
+            rho: KS 聚合参数
+            p: p 范数阶数
+            groups: 单元分组，元素为单元序号数组（从 0 开始），为 None 时全部单元为一组
+
+        Returns:
+            (n_group,) 各组聚合值
+
+        """
+        self._check_compiled()
+        return self._aggregate_state(stress_ref, method, rho, p, groups)[0]
+
+    def aggregate_stress_gradient(self, param, stress_ref, method='ks', rho=50.0, p=8.0, groups=None):
+        """
+        伴随法求应力聚合值对各单元形状参数的导数，每组一个右端项
+
+        Args:
+            param: 形状参数名，例如圆截面的 'R'
+            stress_ref, method, rho, p, groups: 同 aggregate_stress
+
+        Returns:
+            (n_group, n_elem) 数组
+
+        """
+        self._check_compiled()
+        _, weights, dstress_du, bend_unit = self._aggregate_state(stress_ref, method, rho, p, groups)
+        weights = weights / stress_ref
+
+        # 聚合值对单元节点位移的偏导数 Σ_端 w·∂σ/∂u_e，再散射到全局
+        dg_du = np.einsum('gea,eak->gek', weights, dstress_du)
+        dg_dU = np.zeros((len(self.F), len(weights)))
+        np.add.at(dg_dU, (self.element_dof, slice(None)), np.moveaxis(dg_du, 0, -1))
+
+        grad = self._adjoint_gradient(dg_dU, param)
+
+        # y_max 对应力的显式贡献
+        _, _, dy = self._shape_derivatives(param)
+        return grad + dy * np.einsum('gea,ea->ge', weights, bend_unit)
+
+    def disp_gradient(self, dof: int, param):
+        """
+        伴随法求某一自由度位移对各单元形状参数的导数
+
+        Args:
+            dof: 全局自由度编号（与 solve_disp 返回数组的下标一致）
+            param: 形状参数名
+
+        Returns:
+            (n_elem,) 导数数组
+
+        """
+        dg_dU = np.zeros(len(self.F))
+        dg_dU[dof] = 1.0
+        return self._adjoint_gradient(dg_dU, param)
+
+    def _end_stresses(self, U, y_max):
+        """
+        由节点位移计算单元两端的应力 |Fx/A| + |M|·y_max/I
+
+        单元刚度为 A·Ka + I·Kb，因此 Fx/A 与 M/I 只与单位刚度矩阵有关，不需要截面积和惯性矩。
+
+        Args:
+            U: (..., n_dof) 位移，前导维度可以是设计或工况
+            y_max: (..., n_elem) 或 (n_elem,) 截面 y 方向最大距离
+
+        Returns:
+            (..., n_elem, 2) 单元 1、2 端的应力
+
+        """
+        Ka_local, Kb_local, _, _, T = self._unit_stiffness()
+        u_local = np.einsum('eij,...ej->...ei', T, U[..., self.element_dof])
+
+        axial = np.einsum('ej,...ej->...e', Ka_local[:, 0, :], u_local)
+        bend = np.einsum('ekj,...ej->...ek', Kb_local[:, [2, 5], :], u_local)
+
+        return np.abs(axial)[..., None] + np.abs(bend) * np.asarray(y_max)[..., None]
+
+    def _batch_pattern(self):
+        """
+        批量求解共用的 K_ff 稀疏结构：自由度未在编译时重新编号时，由当前设计的分解得到填充减少排序，
+        并预先求出按该排序重排后的 CSR 结构以及原 data 到重排后 data 的映射
+
+        Returns:
+            perm, indptr, indices, data_map
+
+        """
+        def compute():
+            indptr, indices, _, _ = self._assembly_operators()['K_ff']
+            n, nnz = len(indptr) - 1, len(indices)
+            if self.dof_ordering is not None:
+                return np.arange(n), indptr, indices, np.arange(nnz)
+
+            K_ff = self._assemble_K(free=True)
+            lu = splu(K_ff.tocsc(), permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0,
+                      options={'SymmetricMode': True})
+            perm = np.argsort(lu.perm_c)
+
+            # 以 data 下标 + 1 作为数值重排，得到重排后每个非零元对应的原 data 位置
+            M = csr_matrix((np.arange(1, nnz + 1, dtype=float), indices, indptr), shape=(n, n))[perm][:, perm]
+            M.sort_indices()
+            return perm, M.indptr, M.indices, M.data.astype(np.int64) - 1
+
+        return self._cached('batch_pattern', compute)
+
+    def evaluate_batch(self, X, param='R', dense=None, chunk_size=64):
+        """
+        批量评估一组设计（用于遗传算法、粒子群、拉丁超立方抽样等）
+
+        截面性质核、总刚组装和应力计算都在设计维度上向量化；所有设计共用同一 K_ff 稀疏结构和填充减少排序。
+        不改变模型当前的设计。
+
+        Args:
+            X: (n_design, n_var) 设计矩阵，第 j 列为第 j 个含有参数 param 的单元（按单元顺序）的参数值
+            param: 形状参数名
+            dense: 为 True 时批量稠密求解，为 False 时逐个稀疏分解，为 None 时按自由度数自动选择
+            chunk_size: 稠密批量求解时每批的设计数，用于限制内存
 
-        # 设置图例一次，避免重复
-        ax.legend(loc='best')
+        Returns:
+            字典，包含
+                weight: (n_design,) 结构重量
+                max_stress: (n_design,) 最大应力
+                stress: (n_design, n_elem) 各单元最大应力
 
-        def update(val):
-            scale = scale_slider.val
-            for i, beam in enumerate(self.elements):
+        """
+        self._require_monolithic('evaluate_batch')
+        self._check_compiled()
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        n_design = len(X)
+
+        # 各设计的截面性质 (n_design, n_elem)
+        A = np.tile(self.A, (n_design, 1))
+        I = np.tile(self.I, (n_design, 1))
+        y_max = np.tile(self.y_max, (n_design, 1))
+        members_all = self.param_elements(param)
+        if X.shape[1] != len(members_all):
+            raise ValueError(f"X has {X.shape[1]} columns but {len(members_all)} elements have parameter '{param}'")
+
+        for k, cls in enumerate(self.shape_families):
+            names = list(cls.get_parameters())
+            if param not in names:
+                continue
+            members = np.flatnonzero(self.family_id == k)
+            params = np.broadcast_to(self.shape_params[k][self.family_row[members]],
+                                     (n_design, len(members), len(names))).copy()
+            params[..., names.index(param)] = X[:, np.searchsorted(members_all, members)]
+            A[:, members], I[:, members], y_max[:, members] = np.moveaxis(cls.kernel(params), -1, 0)
+
+        # 所有设计的 K_ff data 一次得到 (n_design, nnz)
+        indptr, indices, P_A, P_I = self._assembly_operators()['K_ff']
+        data = (P_A @ A.T + P_I @ I.T).T
+        n_free = len(self.free_dof)
+        F_f = self.F[self.free_dof]
+
+        U = np.zeros((n_design, len(self.F)))
+        if dense is None:
+            dense = n_free <= 200
+        if dense:
+            rows = np.repeat(np.arange(n_free), np.diff(indptr))
+            for start in range(0, n_design, chunk_size):
+                block = data[start:start + chunk_size]
+                K_ff = np.zeros((len(block), n_free, n_free))
+                K_ff[:, rows, indices] = block
+                U[start:start + chunk_size, self.free_dof] = np.linalg.solve(K_ff, F_f[:, None])[..., 0]
+        else:
+            perm, p_indptr, p_indices, data_map = self._batch_pattern()
+            for d in range(n_design):
+                # 对称矩阵的 CSR 结构即其 CSC 结构，排序已给出，直接按自然顺序分解
+                K_ff = csc_matrix((data[d, data_map], p_indices, p_indptr), shape=(n_free, n_free))
+                lu = splu(K_ff, permc_spec='NATURAL', diag_pivot_thresh=0.0, options={'SymmetricMode': True})
+                U[d, self.free_dof[perm]] = lu.solve(F_f[perm])
+
+        stress = self._end_stresses(U, y_max).max(axis=-1)
+
+        return {'weight': (A * self.rho * self.L).sum(axis=1),
+                'max_stress': stress.max(axis=1),
+                'stress': stress}
+
+    def solve_modes(self, k=6):
+        """
+        求解最低的 k 阶固有频率和振型
 
-                node1_id, node2_id = self.nodes.index(beam.node1), self.nodes.index(beam.node2)
+        稀疏 K_ff 与 M_ff 由仿射算子组装，用移位求逆（σ=0）的稀疏 Lanczos 方法（eigsh）求解，
+        K_ff⁻¹ 直接复用静力分析的缓存分解。自由度很少时改用稠密求解。
 
-                # 获取单元节点的变形量
-                x_deformed = [beam.node1.x + scale * U[3 * node1_id],
-                              beam.node2.x + scale * U[3 * node2_id]]
+        Args:
+            k: 阶数
 
-                y_deformed = [beam.node1.y + scale * U[3 * node1_id + 1],
-                              beam.node2.y + scale * U[3 * node2_id + 1]]
+        Returns:
+            freq: (k,) 固有频率（Hz），从小到大排列
+            modes: (n_dof, k) 质量归一化振型（φᵀ·M·φ = 1），约束自由度处为 0
 
-                Phi = beam.Phi
+        """
+        self._require_monolithic('solve_modes')
+        self._check_compiled()
+        if not 1 <= k <= len(self.free_dof):
+            raise ValueError(f"Number of modes k must be between 1 and the number of free DOFs ({len(self.free_dof)}), "
+                             f"got {k}")
+
+        def solve():
+            K_ff = self._assemble_K(free=True)
+            M_ff = self._assemble_M(free=True)
+            n_free = K_ff.shape[0]
+
+            if k >= n_free - 1:
+                lam, phi = eigh(K_ff.toarray(), M_ff.toarray(), subset_by_index=[0, k - 1])
+            else:
+                solver = self.get_solver()
+                OPinv = LinearOperator(K_ff.shape, matvec=solver.solve, dtype=float)
+                lam, phi = eigsh(K_ff, k=k, M=M_ff, sigma=0, which='LM', OPinv=OPinv)
+                order = np.argsort(lam)
+                lam, phi = lam[order], phi[:, order]
 
-                if Phi == 0:
+            # 质量归一化
+            phi = phi / np.sqrt(np.einsum('ik,ik->k', phi, M_ff @ phi))
 
-                    # 对于水平的BeamColumn单元，使用变形后的位置和转角来创建 Hermite 曲线
-                    dydx_1 = U[3 * node1_id + 2] * scale
-                    dydx_2 = U[3 * node2_id + 2] * scale
+            modes = np.zeros((len(self.F), k))
+            modes[self.free_dof] = phi
+            return lam, modes
 
-                    hermite_spline = CubicHermiteSpline(
-                        [x_deformed[0], x_deformed[1]],
-                        [y_deformed[0], y_deformed[1]],
-                        [dydx_1, dydx_2]
-                    )
+        # 缓存中的阶数不够时重新求解
+        if 'modes' in self._cache and self._cache['modes'][1].shape[1] < k:
+            del self._cache['modes']
+        lam, modes = self._cached('modes', solve)
 
-                    # 生成插值点
-                    x_spline = np.linspace(x_deformed[0], x_deformed[1], 100)
-                    y_spline = hermite_spline(x_spline)
+        return np.sqrt(np.abs(lam[:k])) / (2 * np.pi), modes[:, :k].copy()
 
-                    deformed_lines[i].set_data(x_spline, y_spline)
+    def frequency_gradient(self, param, mode=0):
+        """
+        第 mode 阶固有频率对各单元形状参数的导数（单特征值，不需要额外求解）
 
-                else:
+        dλ/dp = φᵀ·(∂K/∂p - λ·∂M/∂p)·φ，其中 λ = ω²，f = ω/2π。
 
-                    length = np.sqrt((x_deformed[1] - x_deformed[0]) ** 2 +
-                                     (y_deformed[1] - y_deformed[0]) ** 2)
-                    phi = np.arctan2(y_deformed[1] - y_deformed[0],
-                                     x_deformed[1] - x_deformed[0])
+        Args:
+            param: 形状参数名
+            mode: 振型阶次（从 0 开始）
 
-                    dydx_1 = U[3 * node1_id + 2] * scale + (Phi - phi)
-                    dydx_2 = U[3 * node2_id + 2] * scale + (Phi - phi)
+        Returns:
+            (n_elem,) 导数数组（Hz/参数单位）
 
-                    # Hermite插值在局部坐标系中进行
-                    hermite_spline = CubicHermiteSpline(
-                        [0, length],
-                        [0, 0],
-                        [dydx_1, dydx_2]
-                    )
+        """
+        freq, modes = self.solve_modes(mode + 1)
+        lam = (2 * np.pi * freq[mode]) ** 2
+        phi_e = modes[self.element_dof, mode]
 
-                    # 局部坐标插值
-                    x_old = np.linspace(0, length, 1000)
-                    y_old = hermite_spline(x_old)
+        dA, dI, _ = self._shape_derivatives(param)
+        _, _, Ka_global, Kb_global, _ = self._unit_stiffness()
+        M_unit = self._mass_operators()['M_unit']
 
-                    # 坐标转换
-                    x_new = x_deformed[0] + cos(phi) * x_old - sin(phi) * y_old
-                    y_new = y_deformed[0] + sin(phi) * x_old + cos(phi) * y_old
+        dlam = (dA * np.einsum('ei,eij,ej->e', phi_e, Ka_global - lam * M_unit, phi_e) +
+                dI * np.einsum('ei,eij,ej->e', phi_e, Kb_global, phi_e))
 
-                    deformed_lines[i].set_data(x_new, y_new)
+        return dlam / (8 * np.pi ** 2 * freq[mode])
 
-            fig.canvas.draw_idle()
+    def deformed_shape(self, U=None, n_points=20):
+        """
+        用梁单元的形函数在每个单元上采样变形曲线：轴向位移线性插值，横向位移 Hermite 三次插值
 
-        # 绑定滑动条到更新函数
-        scale_slider.on_changed(update)
+        变形后坐标为 base + scale·disp，对任意放大系数只需一次数组运算。
 
-        # 初次绘制变形系统
-        update(initial_scale)
+        Args:
+            U: (..., n_dof) 节点位移，前导维度可以是设计或工况；为 None 时为当前设计的位移
+            n_points: 每个单元的采样点数
+
+        Returns:
+            base: (n_elem, n_points, 2) 未变形的采样点坐标
+            disp: (..., n_elem, n_points, 2) 采样点的位移（全局坐标）
+
+        """
+        self._check_compiled()
+        U = self.solve_disp() if U is None else np.asarray(U, dtype=float)
+        xi = np.linspace(0.0, 1.0, n_points)
+        L = self.L[:, None]
+
+        # 形函数 (n_elem, n_points)
+        N1 = np.broadcast_to(1 - 3 * xi ** 2 + 2 * xi ** 3, (len(L), n_points))
+        N2 = L * (xi - 2 * xi ** 2 + xi ** 3)
+        N3 = np.broadcast_to(3 * xi ** 2 - 2 * xi ** 3, (len(L), n_points))
+        N4 = L * (-xi ** 2 + xi ** 3)
+
+        # 局部坐标下的单元节点位移 (..., n_elem, 6)
+        T = transfer_matrix_batch(self.Phi)
+        u = np.einsum('eij,...ej->...ei', T, U[..., self.element_dof])
+        axial = (1 - xi) * u[..., 0, None] + xi * u[..., 3, None]
+        transverse = N1 * u[..., 1, None] + N2 * u[..., 2, None] + N3 * u[..., 4, None] + N4 * u[..., 5, None]
+
+        # 转回全局坐标
+        c, s = np.cos(self.Phi)[:, None], np.sin(self.Phi)[:, None]
+        disp = np.stack([c * axial - s * transverse, s * axial + c * transverse], axis=-1)
+
+        start = self.coords[self.connectivity[:, 0]][:, None, :]
+        end = self.coords[self.connectivity[:, 1]][:, None, :]
+        base = start + xi[:, None] * (end - start)
+
+        return base, disp
+
+    def plot_system(self, initial_scale=1.0, scale_max=1000.0, n_points=20):
+        """
+        交互式绘制结构及其变形，拖动滑动条调整变形放大系数（见 plotting.plot_system）
+        """
+        # 绘图模块在第一次绘图时才导入，只做分析的进程不会加载 matplotlib
+        from plotting import plot_system
+        plot_system(self, initial_scale, scale_max, n_points)
+
+    def save_deformed(self, filename, U=None, scale=1.0, titles=None, n_points=20, labels=False, dpi=100):
+        """
+        不弹出窗口，把一个或多个变形图直接保存为图片（见 plotting.save_deformed）
 
-        plt.show()
+        Returns:
+            保存的文件名列表
+
+        """
+        from plotting import save_deformed
+        return save_deformed(self, filename, U, scale, titles, n_points, labels, dpi)